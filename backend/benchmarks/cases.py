@@ -0,0 +1,250 @@
+"""
+Benchmark cases. Each case is registered with its problem size per scale
+and a setup function that builds synthetic inputs and returns
+`(func, units)`: the callable to time and how many units (bars, symbols,
+rows, requests, ...) one call processes.
+
+Modules under test are imported inside the setup functions, after the
+runner has pointed DATABASE_URL and the data directories at a scratch
+workspace.
+"""
+
+import asyncio
+
+import numpy as np
+
+from benchmarks.data import (
+    FakeBinanceClient,
+    FakeExchange,
+    synthetic_bars,
+    synthetic_books,
+    synthetic_tickers,
+    synthetic_trades,
+)
+
+SCALES = ("small", "medium", "large")
+CASES = {}
+
+
+def case(name, unit, **scales):
+    def register(setup):
+        CASES[name] = {"setup": setup, "unit": unit, "scales": scales}
+        return setup
+
+    return register
+
+
+def ingest_bars(symbols, n_bars, seed=0):
+    """
+    Put synthetic 1m history for each symbol into the candle store.
+    """
+    from candles import get_candle_store
+
+    store = get_candle_store()
+    bars = synthetic_bars(len(symbols), n_bars, seed=seed)
+    for symbol, rows in zip(symbols, bars):
+        if store.last_timestamp(symbol) is None:
+            store.ingest(symbol, rows.tolist())
+    return store
+
+
+def reset_trades(n_trades):
+    from sqlalchemy import delete, insert
+
+    from models import Base, Trade
+    from resources import get_engine, get_session
+
+    Base.metadata.create_all(bind=get_engine())
+    with get_session() as session:
+        session.execute(delete(Trade))
+        if n_trades:
+            session.execute(insert(Trade), synthetic_trades(n_trades))
+        session.commit()
+
+
+@case("indicators.features", "bars", small=10_000, medium=100_000, large=1_000_000)
+def indicators_features(n):
+    from features import compute_features
+
+    bars = synthetic_bars(10, n // 10, step_ms=60 * 60_000)
+    return (lambda: compute_features(bars)), n
+
+
+@case(
+    "indicators.moving_averages",
+    "bars",
+    small=10_000,
+    medium=100_000,
+    large=1_000_000,
+)
+def indicators_moving_averages(n):
+    import pandas as pd
+
+    df = pd.DataFrame({"close": synthetic_bars(1, n)[0, :, 4]})
+
+    def run():
+        df["close"].rolling(window=10).mean()
+        df["close"].rolling(window=50).mean()
+
+    return run, n
+
+
+@case("backtest.ma_crossover", "bars", small=1_000, medium=10_000, large=100_000)
+def backtest_ma_crossover(n):
+    import main
+
+    symbol = f"BACKTEST{n}/USDT"
+    ingest_bars([symbol], n, seed=3)
+    main.get_exchange = lambda: FakeExchange({})
+    long_term = n // 5
+
+    def run():
+        asyncio.run(
+            main.backtest_trading(
+                symbol=symbol,
+                short_term=max(long_term // 5, 2),
+                long_term=long_term,
+                timeframe="1m",
+            )
+        )
+
+    return run, n
+
+
+@case("signals.ma_crossover", "symbols", small=10, medium=50, large=250)
+def signals_ma_crossover(n):
+    from strategies import moving_average_crossover
+
+    symbols = [f"S{i}/USDT" for i in range(n)]
+    ingest_bars(symbols, 4_000, seed=4)
+    exchange = FakeExchange({})
+
+    def run():
+        for symbol in symbols:
+            moving_average_crossover(symbol, exchange, 5, 10, simulate=False)
+
+    return run, n
+
+
+@case("signals.ai_batched", "symbols", small=10, medium=50, large=250)
+def signals_ai_batched(n):
+    import strategies
+    from benchmarks.inference import synthetic_model
+
+    symbols = [f"S{i}/USDT" for i in range(n)]
+    ingest_bars(symbols, 4_000, seed=4)
+    model = synthetic_model(window=32, kind="logistic")
+    strategies.get_model = lambda: model
+    exchange = FakeExchange({})
+    return (lambda: strategies.ai_signals(symbols, exchange)), n
+
+
+@case("worker.execute_trading_strategy", "symbols", small=10, medium=50, large=250)
+def worker_execute_trading_strategy(n):
+    import celery_worker
+
+    symbols = [f"W{i}USDT" for i in range(n)]
+    ingest_bars(symbols, 4_000, seed=5)
+    reset_trades(0)
+    celery_worker.get_binance_client = FakeBinanceClient
+    # Redis is not part of this benchmark: every signal is new.
+    celery_worker.claim_execution = lambda key: True
+    celery_worker.release_execution = lambda key: None
+
+    def run():
+        for symbol in symbols:
+            celery_worker.run_trading_strategy(symbol)
+
+    return run, n
+
+
+@case("db.write_trades", "rows", small=1_000, medium=10_000, large=100_000)
+def db_write_trades(n):
+    from models import Trade
+    from resources import get_session
+
+    reset_trades(0)
+    rows = synthetic_trades(n)
+
+    def run():
+        with get_session() as session:
+            session.add_all([Trade(**row) for row in rows])
+            session.commit()
+
+    return run, n
+
+
+@case("db.read_trades", "rows", small=1_000, medium=10_000, large=100_000)
+def db_read_trades(n):
+    from models import Trade
+    from resources import get_session
+
+    reset_trades(n)
+
+    def run():
+        with get_session() as session:
+            session.query(Trade).order_by(Trade.timestamp).all()
+
+    return run, n
+
+
+def endpoint(path, n):
+    import httpx
+
+    from main import create_app
+
+    reset_trades(n)
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app()), base_url="http://bench"
+    )
+
+    def run():
+        response = loop.run_until_complete(client.get(path))
+        response.raise_for_status()
+
+    return run, 1
+
+
+@case("api.trades", "requests", small=100, medium=1_000, large=10_000)
+def api_trades(n):
+    return endpoint("/trades", n)
+
+
+@case("api.performance", "requests", small=100, medium=1_000, large=10_000)
+def api_performance(n):
+    return endpoint("/performance", n)
+
+
+@case("screener.rank", "symbols", small=1_000, medium=5_000, large=20_000)
+def screener_rank(n):
+    from screener import TickerSnapshot, default_filters, normalize_ccxt
+
+    batch = normalize_ccxt(synthetic_tickers(n))
+
+    def run():
+        snapshot = TickerSnapshot()
+        snapshot.update(batch)
+        snapshot.top(10, default_filters())
+
+    return run, n
+
+
+@case("orderbook.vwap", "queries", small=10_000, medium=100_000, large=1_000_000)
+def orderbook_vwap(n):
+    from orderbook import get_orderbook_store
+
+    store = get_orderbook_store()
+    symbol = "BOOK/USDT"
+    if not store.has(symbol):
+        store.record(symbol, synthetic_books(5_000), tick_size=0.01)
+    rng = np.random.default_rng(6)
+    quantities = rng.lognormal(1, 1, n)
+    times, _ = store.levels(symbol)
+    timestamps = rng.integers(times[0], times[-1], n)
+
+    def run():
+        store.vwap_many(symbol, "buy", quantities, timestamps)
+        store.vwap_many(symbol, "sell", quantities, timestamps)
+
+    return run, 2 * n
@@ -0,0 +1,134 @@
+"""
+Synthetic market data for benchmarks.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+MINUTE_MS = 60_000
+START_MS = 1_700_000_000_000 // MINUTE_MS * MINUTE_MS
+
+
+def synthetic_bars(n_symbols, n_bars, step_ms=MINUTE_MS, seed=0):
+    """
+    Random-walk OHLCV bars shaped (n_symbols, n_bars, 6).
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.002, size=(n_symbols, n_bars))
+    close = 100 * np.exp(np.cumsum(returns, axis=1))
+    open_ = np.concatenate((close[:, :1], close[:, :-1]), axis=1)
+    spread = np.abs(rng.normal(0, 0.001, size=close.shape)) * close
+    bars = np.empty((n_symbols, n_bars, 6))
+    bars[..., 0] = START_MS + np.arange(n_bars) * step_ms
+    bars[..., 1] = open_
+    bars[..., 2] = np.maximum(open_, close) + spread
+    bars[..., 3] = np.minimum(open_, close) - spread
+    bars[..., 4] = close
+    bars[..., 5] = rng.lognormal(3, 1, size=close.shape)
+    return bars
+
+
+def synthetic_tickers(n_symbols, seed=0):
+    """
+    ccxt `fetch_tickers()`-style dict for a universe of n_symbols pairs,
+    spread over a few quote assets.
+    """
+    rng = np.random.default_rng(seed)
+    quotes = ["USDT", "USDT", "USDT", "BTC", "BRL"]
+    last = rng.lognormal(2, 2, n_symbols)
+    spread = rng.uniform(0.0001, 0.01, n_symbols) * last
+    tickers = {}
+    for i in range(n_symbols):
+        symbol = f"C{i}/{quotes[i % len(quotes)]}"
+        tickers[symbol] = {
+            "symbol": symbol,
+            "percentage": float(rng.normal(0, 5)),
+            "quoteVolume": float(rng.lognormal(12, 3)),
+            "bid": float(last[i] - spread[i] / 2),
+            "ask": float(last[i] + spread[i] / 2),
+            "high": float(last[i] * 1.05),
+            "low": float(last[i] * 0.95),
+            "last": float(last[i]),
+        }
+    return tickers
+
+
+def synthetic_trades(n_trades, n_symbols=20, seed=0):
+    """
+    Column dicts for the trades table, half of them closed.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2024, 1, 1)
+    entry = rng.lognormal(3, 1, n_trades)
+    rows = []
+    for i in range(n_trades):
+        closed = i % 2 == 0
+        exit_price = float(entry[i] * rng.normal(1, 0.03)) if closed else None
+        rows.append(
+            {
+                "symbol": f"C{i % n_symbols}/USDT",
+                "action": "BUY",
+                "entry_price": float(entry[i]),
+                "exit_price": exit_price,
+                "quantity": 1.0,
+                "stop_loss_price": float(entry[i] * 0.95),
+                "take_profit_price": float(entry[i] * 1.1),
+                "profit_loss": exit_price - float(entry[i]) if closed else None,
+                "timestamp": start + timedelta(minutes=i),
+            }
+        )
+    return rows
+
+
+def synthetic_books(n_snapshots, depth=20, seed=0):
+    """
+    ccxt-style order books around a random-walk mid price, one per second.
+    """
+    rng = np.random.default_rng(seed)
+    mid = 100 * np.exp(np.cumsum(rng.normal(0, 0.0005, n_snapshots)))
+    books = []
+    for i in range(n_snapshots):
+        best_bid = round(mid[i] - 0.01, 2)
+        books.append(
+            {
+                "timestamp": START_MS + i * 1000,
+                "bids": [
+                    [round(best_bid - 0.01 * level, 2), float(q)]
+                    for level, q in enumerate(rng.lognormal(0, 1, depth))
+                ],
+                "asks": [
+                    [round(best_bid + 0.02 + 0.01 * level, 2), float(q)]
+                    for level, q in enumerate(rng.lognormal(0, 1, depth))
+                ],
+            }
+        )
+    return books
+
+
+class FakeExchange:
+    """
+    Offline stand-in for the ccxt client. OHLCV is served from whatever is
+    already in the candle store, so fetches return nothing new.
+    """
+
+    def __init__(self, tickers):
+        self.tickers = tickers
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        return []
+
+    def fetch_tickers(self):
+        return self.tickers
+
+    def fetch_ticker(self, symbol):
+        return self.tickers[symbol]
+
+
+class FakeBinanceClient:
+    """
+    Offline stand-in for the python-binance Client used by the worker.
+    """
+
+    def get_klines(self, symbol, interval, startTime=None, limit=None):
+        return []
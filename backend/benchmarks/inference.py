@@ -0,0 +1,103 @@
+"""
+Latency benchmark for the AI signal path: batched vs per-symbol inference,
+and full vs cached feature computation. Run from backend/:
+
+    python -m benchmarks.inference --symbols 200 --output benchmarks/results/inference.json
+"""
+
+import argparse
+import json
+import os
+import time
+
+from benchmarks.data import synthetic_bars
+from features import LOOKBACK, FeatureCache
+from inference import SignalModel, load_model
+from train_model import build_dataset, make_estimator
+
+HOUR_MS = 60 * 60_000
+
+
+def best_of(func, repeat):
+    """
+    Fastest wall time of `repeat` calls, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def synthetic_model(window, kind):
+    bars = synthetic_bars(8, 2000, step_ms=HOUR_MS, seed=1)
+    inputs, labels, _ = build_dataset(dict(enumerate(bars)), window, horizon=1)
+    estimator = make_estimator(kind)
+    estimator.fit(inputs, labels)
+    return SignalModel(estimator=estimator, window=window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI inference latency benchmark.")
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--window", type=int, default=32)
+    parser.add_argument("--model-path", help="Use a trained model instead")
+    parser.add_argument(
+        "--model", choices=["gbm", "logistic", "lightgbm"], default="gbm"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", default=os.path.join("benchmarks", "results", "inference.json")
+    )
+    args = parser.parse_args()
+
+    if args.model_path:
+        model = load_model(args.model_path)
+    else:
+        model = synthetic_model(args.window, args.model)
+    window = model.window or args.window
+
+    n_bars = window + LOOKBACK + 500
+    bars = synthetic_bars(args.symbols, n_bars + 1, step_ms=HOUR_MS, seed=2)
+    current = {f"SYM{i}": bars[i, :-1] for i in range(args.symbols)}
+    latest = {f"SYM{i}": bars[i, 1:] for i in range(args.symbols)}
+
+    def cold_features():
+        FeatureCache(window).tensor(current)
+
+    def cached_features():
+        cache = FeatureCache(window)
+        cache.tensor(current)
+        started = time.perf_counter()
+        cache.tensor(latest)
+        return time.perf_counter() - started
+
+    tensor = FeatureCache(window).tensor(latest)
+
+    def per_symbol():
+        for i in range(len(tensor)):
+            model.predict_proba(tensor[i : i + 1])
+
+    results = {
+        "symbols": args.symbols,
+        "window": window,
+        "features_full_ms": round(best_of(cold_features, args.repeat), 3),
+        "features_incremental_ms": round(
+            min(cached_features() for _ in range(args.repeat)) * 1000, 3
+        ),
+        "predict_batched_ms": round(
+            best_of(lambda: model.predict_proba(tensor), args.repeat), 3
+        ),
+        "predict_per_symbol_ms": round(best_of(per_symbol, args.repeat), 3),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    for name, value in results.items():
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Benchmark regression suite. Run from backend/:
+
+    python -m benchmarks.run --scale small --output benchmarks/results/latest.json
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json --threshold 0.2
+
+Cases run offline on synthetic candles, tickers, trades and order books,
+with SQLite standing in for Postgres and a scratch directory for the
+candle and order-book stores. Results are written as JSON; with
+--baseline, any case slower than baseline * (1 + threshold) is reported
+and the run exits with status 1. So does a baseline case at the selected
+scales that did not run (skipped on a missing dependency, or removed);
+with -k only baseline cases matching the filter are expected.
+
+This is a standalone runner, not part of the pytest suite, so that
+`pytest` stays fast. It also points DATABASE_URL and the data directories
+at a scratch workspace before any backend module is imported.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+def configure_workspace(path):
+    """
+    Point every store at a scratch directory before backend modules load.
+    """
+    os.makedirs(path, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(path, 'bench.db')}"
+    os.environ["CANDLE_DATA_DIR"] = os.path.join(path, "candles")
+    os.environ["ORDERBOOK_DATA_DIR"] = os.path.join(path, "orderbooks")
+    os.environ["MODEL_PATH"] = os.path.join(path, "models", "signal.pkl")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(func, repeat):
+    func()  # warm-up: first calls fill caches and lazy imports
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run_cases(cases, scales, name_filter, repeat):
+    results = {}
+    for name, spec in cases.items():
+        if name_filter and not any(part in name for part in name_filter):
+            continue
+        for scale in scales:
+            size = spec["scales"][scale]
+            key = f"{name}[{scale}]"
+            try:
+                func, units = spec["setup"](size)
+                timings = measure(func, repeat)
+            except ImportError as e:
+                print(f"{key}: skipped ({e})")
+                continue
+            best = min(timings)
+            results[key] = {
+                "size": size,
+                "unit": spec["unit"],
+                "best_seconds": best,
+                "median_seconds": statistics.median(timings),
+                "units_per_second": units / best if best else None,
+            }
+            print(
+                f"{key:48} {best * 1000:10.3f} ms  "
+                f"{units / best if best else float('inf'):14.1f} {spec['unit']}/s"
+            )
+    return results
+
+
+def expected_keys(baseline, scales, name_filter):
+    """
+    Baseline cases this run should have measured: those at the selected
+    scales and, with -k, matching the filter.
+    """
+    keys = []
+    for key in baseline.get("results", {}):
+        name, _, scale = key.rstrip("]").partition("[")
+        if scale not in scales:
+            continue
+        if name_filter and not any(part in name for part in name_filter):
+            continue
+        keys.append(key)
+    return keys
+
+
+def compare(results, baseline, threshold, expected=()):
+    """
+    Cases whose best time regressed beyond the threshold, as (key, ratio),
+    and `expected` baseline cases that are missing from this run.
+    """
+    regressions = []
+    print(f"\n{'case':48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key, current in sorted(results.items()):
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        ratio = current["best_seconds"] / previous["best_seconds"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(
+            f"{key:48} {previous['best_seconds'] * 1000:8.2f}ms "
+            f"{current['best_seconds'] * 1000:8.2f}ms {ratio:7.2f}{flag}"
+        )
+        if flag:
+            regressions.append((key, ratio))
+
+    missing = sorted(key for key in expected if key not in results)
+    for key in missing:
+        print(f"{key:48} {'MISSING (skipped or removed)':>30}")
+    return regressions, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument(
+        "--scale",
+        nargs="+",
+        choices=["small", "medium", "large", "all"],
+        default=["small"],
+    )
+    parser.add_argument(
+        "-k", dest="name_filter", nargs="+", help="Only cases containing any of these"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", default=os.path.join("benchmarks", "results", "latest.json")
+    )
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("BENCHMARK_THRESHOLD", 0.2)),
+        help="Allowed slowdown as a fraction (0.2 = 20%%)",
+    )
+    parser.add_argument("--workspace", help="Scratch directory (default: temporary)")
+    args = parser.parse_args()
+
+    configure_workspace(args.workspace or tempfile.mkdtemp(prefix="benchmarks_"))
+    from benchmarks.cases import CASES, SCALES
+
+    scales = SCALES if "all" in args.scale else args.scale
+    results = run_cases(CASES, scales, args.name_filter, args.repeat)
+
+    report = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        expected = expected_keys(baseline, scales, args.name_filter)
+        regressions, missing = compare(results, baseline, args.threshold, expected)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {1 + args.threshold:.2f}x")
+        if missing:
+            print(f"\n{len(missing)} baseline case(s) missing from this run")
+        if regressions or missing:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
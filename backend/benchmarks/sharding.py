@@ -0,0 +1,95 @@
+"""
+Multi-process check of symbol sharding and per-symbol leases. Run from
+backend/ against a local Redis:
+
+    REDIS_URL=redis://localhost:6379/15 python -m benchmarks.sharding --workers 4
+
+Every worker process computes the symbol -> queue map (which must be
+identical everywhere), then all workers race to execute the same
+(symbol, round) jobs through `symbol_lease` + `claim_execution`. Each job
+must run exactly once.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter
+
+from locks import claim_execution, symbol_lease
+from resources import get_redis
+from sharding import HashRing, queue_for, shard_queues
+
+RUN_KEY = "bench:sharding:executions"
+
+
+def worker(symbols, rounds, results):
+    assignment = {symbol: queue_for(symbol) for symbol in symbols}
+    redis = get_redis()
+    for round_ in range(rounds):
+        for symbol in symbols:
+            with symbol_lease(symbol, ttl=5) as acquired:
+                if acquired and claim_execution(f"bench:{symbol}:{round_}", ttl=60):
+                    redis.rpush(RUN_KEY, f"{symbol}:{round_}")
+                    time.sleep(0.001)  # hold the lease like a real task would
+    results.put(assignment)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharding and lease check.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    redis = get_redis()
+    redis.delete(RUN_KEY)
+    for key in redis.scan_iter("executed:bench:*"):
+        redis.delete(key)
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(symbols, args.rounds, results))
+        for _ in range(args.workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    assignments = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+
+    executions = Counter(item.decode() for item in redis.lrange(RUN_KEY, 0, -1))
+    expected = {
+        f"{symbol}:{round_}" for symbol in symbols for round_ in range(args.rounds)
+    }
+    # Adding a shard should only move roughly 1 / (shards + 1) of the symbols.
+    grown = HashRing(shard_queues(len(shard_queues()) + 1))
+    moved = sum(queue_for(symbol) != grown.node_for(symbol) for symbol in symbols)
+
+    report = {
+        "workers": args.workers,
+        "jobs": len(expected),
+        "seconds": round(elapsed, 3),
+        "consistent_assignment": all(a == assignments[0] for a in assignments),
+        "symbols_per_queue": dict(Counter(assignments[0].values())),
+        "missing_jobs": len(expected - set(executions)),
+        "duplicate_jobs": sum(count > 1 for count in executions.values()),
+        "moved_on_new_shard": round(moved / len(symbols), 3),
+    }
+    print(json.dumps(report, indent=2))
+    redis.delete(RUN_KEY)
+
+    ok = (
+        report["consistent_assignment"]
+        and report["missing_jobs"] == 0
+        and report["duplicate_jobs"] == 0
+    )
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Startup-time benchmark for the API and the Celery worker.
+
+Measures the import cost of `main` and `celery_worker` with
+`python -X importtime`, and the time from launching uvicorn to the first
+successful /status response. Run from backend/:
+
+    python -m benchmarks.startup --output benchmarks/results/startup.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["main", "celery_worker"]
+
+
+def benchmark_env():
+    """
+    Environment for child processes: no network credentials, SQLite database.
+    """
+    env = dict(os.environ)
+    env.setdefault(
+        "DATABASE_URL",
+        f"sqlite:///{os.path.join(tempfile.gettempdir(), 'startup_bench.db')}",
+    )
+    env.setdefault("CANDLE_DATA_DIR", tempfile.mkdtemp(prefix="candles_"))
+    return env
+
+
+def parse_importtime(stderr):
+    """
+    Return [(module, cumulative seconds), ...] from a `-X importtime` report,
+    slowest first.
+    """
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative_us, name = line.split(":", 1)[1].split("|")
+        modules.append((name.strip(), int(cumulative_us.strip()) / 1e6))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return modules
+
+
+def measure_import(module, env, repeat):
+    """
+    Best-of-N import time of a module in a fresh interpreter.
+    """
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=BACKEND_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+        modules = parse_importtime(proc.stderr)
+        total = dict(modules)[module]
+        if best is None or total < best[0]:
+            best = (total, modules)
+    total, modules = best
+    return {
+        "import_seconds": round(total, 4),
+        "slowest_modules": [
+            {"module": name, "cumulative_seconds": round(seconds, 4)}
+            for name, seconds in modules[:10]
+        ],
+    }
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_first_request(env, timeout=30.0):
+    """
+    Seconds from spawning uvicorn until /status answers with HTTP 200.
+    """
+    port = free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError("uvicorn exited before serving a request")
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{port}/status", timeout=1
+                ) as response:
+                    if response.status == 200:
+                        return round(time.perf_counter() - started, 4)
+            except OSError:
+                time.sleep(0.01)
+        raise RuntimeError(f"No response from /status within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output", default=os.path.join("benchmarks", "results", "startup.json")
+    )
+    args = parser.parse_args()
+
+    env = benchmark_env()
+    results = {
+        "timestamp": datetime.utcnow().isoformat(),
+        "python": platform.python_version(),
+        "imports": {
+            module: measure_import(module, env, args.repeat) for module in MODULES
+        },
+        "first_request_seconds": measure_first_request(env),
+    }
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    for module, data in results["imports"].items():
+        print(f"import {module}: {data['import_seconds']:.3f}s")
+    print(f"first request: {results['first_request_seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Literal
+
+import numpy as np
+
+from symbols import normalize_symbol
+
+# Timeframe lengths in milliseconds. Everything is derived from 1m bars.
+TIMEFRAMES = {
+    "1m": 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "1h": 60 * 60_000,
+    "4h": 4 * 60 * 60_000,
+    "1d": 24 * 60 * 60_000,
+}
+Timeframe = Literal["1m", "5m", "15m", "1h", "4h", "1d"]
+BASE_TIMEFRAME = "1m"
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+MAX_FETCH_LIMIT = 1000  # Binance caps klines requests at 1000 rows
+
+DEFAULT_CANDLE_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "candles"
+)
+
+
+def resample(bars, timeframe):
+    """
+    Aggregate 1m OHLCV rows (N x 6 array) into bars of the given timeframe.
+    The last returned bar is still open if its bucket is not complete yet.
+    """
+    step = TIMEFRAMES[timeframe]
+    if len(bars) == 0:
+        return np.empty((0, len(COLUMNS)))
+    if timeframe == BASE_TIMEFRAME:
+        return np.array(bars, dtype=np.float64)
+
+    buckets = (bars[:, 0].astype(np.int64) // step) * step
+    starts = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], starts))
+    ends = np.concatenate((starts[1:], [len(bars)])) - 1
+
+    out = np.empty((len(starts), len(COLUMNS)))
+    out[:, 0] = buckets[starts]
+    out[:, 1] = bars[starts, 1]
+    out[:, 2] = np.maximum.reduceat(bars[:, 2], starts)
+    out[:, 3] = np.minimum.reduceat(bars[:, 3], starts)
+    out[:, 4] = bars[ends, 4]
+    out[:, 5] = np.add.reduceat(bars[:, 5], starts)
+    return out
+
+
+def ccxt_fetcher(exchange, symbol):
+    """
+    Build a 1m fetch function backed by a ccxt exchange (e.g. "BTC/USDT").
+    """
+
+    def fetch(since, limit):
+        return exchange.fetch_ohlcv(
+            symbol, timeframe=BASE_TIMEFRAME, since=since, limit=limit
+        )
+
+    return fetch
+
+
+def binance_fetcher(client, symbol):
+    """
+    Build a 1m fetch function backed by a python-binance Client (e.g. "BTCUSDT").
+    """
+
+    def fetch(since, limit):
+        klines = client.get_klines(
+            symbol=symbol, interval=BASE_TIMEFRAME, startTime=since, limit=limit
+        )
+        return [[float(value) for value in row[:6]] for row in klines]
+
+    return fetch
+
+
+class CandleStore:
+    """
+    On-disk store of 1m candles per symbol, read through memory-mapped arrays.
+    Higher timeframes are aggregated on demand and only the open bar is
+    recomputed when new 1m bars arrive.
+    """
+
+    def __init__(self, data_dir=DEFAULT_CANDLE_DATA_DIR):
+        self.data_dir = data_dir
+        os.makedirs(self.data_dir, exist_ok=True)
+        # (symbol, timeframe) -> (rows consumed, first timestamp, start row of
+        # last bar, bars); keyed by the normalized symbol
+        self._resampled = {}
+        # symbol -> earliest timestamp the exchange has (no older bars exist)
+        self._history_start = {}
+
+    def _path(self, symbol):
+        return os.path.join(self.data_dir, f"{normalize_symbol(symbol)}.1m.f8")
+
+    @contextmanager
+    def _locked(self, symbol):
+        """
+        Exclusive lock on a symbol's file, shared by every process using the
+        data directory. A sidecar file is locked because a backfill replaces
+        the data file itself.
+        """
+        with open(self._path(symbol) + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def load(self, symbol):
+        """
+        Return the stored 1m bars of a symbol as a read-only (N x 6) memmap.
+        """
+        path = self._path(symbol)
+        row_bytes = len(COLUMNS) * 8
+        # A row being appended by another process is left out until complete.
+        rows = os.path.getsize(path) // row_bytes if os.path.exists(path) else 0
+        if rows == 0:
+            return np.empty((0, len(COLUMNS)))
+        return np.memmap(path, dtype=np.float64, mode="r", shape=(rows, len(COLUMNS)))
+
+    def first_timestamp(self, symbol):
+        bars = self.load(symbol)
+        return int(bars[0, 0]) if len(bars) else None
+
+    def last_timestamp(self, symbol):
+        bars = self.load(symbol)
+        return int(bars[-1, 0]) if len(bars) else None
+
+    def _prepend(self, symbol, older):
+        """
+        Rewrite the file with `older` rows in front. Must be called with the
+        symbol locked. Row indices shift; `get` notices through the changed
+        first timestamp, including in other processes.
+        """
+        path = self._path(symbol)
+        combined = np.concatenate((older, np.array(self.load(symbol))))
+        with open(path + ".tmp", "wb") as f:
+            f.write(combined.tobytes())
+        os.replace(path + ".tmp", path)
+
+    def ingest(self, symbol, rows):
+        """
+        Append 1m rows ([timestamp, open, high, low, close, volume]) for a symbol.
+        A row for the latest stored minute replaces it (the exchange keeps
+        updating the current minute until it closes). Rows older than the
+        stored history are backfilled in front; rows inside it are ignored.
+        The file is locked throughout, so concurrent writers never duplicate
+        or reorder rows.
+        """
+        if not rows:
+            return 0
+        new = np.asarray([row[:6] for row in rows], dtype=np.float64)
+        _, keep = np.unique(new[:, 0][::-1], return_index=True)
+        new = new[len(new) - 1 - keep]  # sorted, last duplicate wins
+        added = 0
+        with self._locked(symbol):
+            # Bounds are read under the lock: another process may have
+            # written since this one fetched.
+            first = self.first_timestamp(symbol)
+            if first is not None:
+                older = new[new[:, 0] < first]
+                if len(older):
+                    self._prepend(symbol, older)
+                    added += len(older)
+
+            last = self.last_timestamp(symbol)
+            if last is not None:
+                current = new[new[:, 0] == last]
+                if len(current):
+                    stored = np.memmap(self._path(symbol), dtype=np.float64, mode="r+")
+                    stored[-len(COLUMNS) :] = current[-1]
+                    stored.flush()
+                    del stored
+                new = new[new[:, 0] > last]
+
+            if len(new):
+                with open(self._path(symbol), "ab") as f:
+                    f.write(new.tobytes())
+        return added + len(new)
+
+    def _pull(self, symbol, fetch, since, until=None):
+        """
+        Fetch 1m bars from `since`, page by page, up to `until` (exclusive) or
+        the newest bar the exchange has, and ingest them in one go so that a
+        multi-page backfill lands in front of the stored history as a whole.
+        Returns the number of rows received.
+        """
+        pages = []
+        while True:
+            rows = fetch(since, MAX_FETCH_LIMIT)
+            if until is not None:
+                rows = [row for row in rows if row[0] < until]
+            if not rows:
+                break
+            pages.extend(rows)
+            newest = int(rows[-1][0])
+            if len(rows) < MAX_FETCH_LIMIT or newest <= since:
+                break
+            since = newest
+        self.ingest(symbol, pages)
+        return len(pages)
+
+    def sync(self, symbol, fetch, minutes):
+        """
+        Pull the missing 1m bars covering the last `minutes` minutes:
+        older history in front of what is stored, then anything newer.
+        """
+        step = TIMEFRAMES[BASE_TIMEFRAME]
+        since = int(time.time() * 1000) - minutes * step
+        first = self.first_timestamp(symbol)
+
+        if first is None:
+            self._pull(symbol, fetch, since)
+            return
+
+        history_start = self._history_start.get(normalize_symbol(symbol), -1)
+        if since < first and first > history_start:
+            if not self._pull(symbol, fetch, since, until=first):
+                # Nothing older exists (e.g. a recent listing); don't ask again.
+                self._history_start[normalize_symbol(symbol)] = first
+        self._pull(symbol, fetch, max(since, self.last_timestamp(symbol)))
+
+    def get(self, symbol, timeframe="1h", limit=None):
+        """
+        Return bars of any supported timeframe as an (N x 6) array.
+        """
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unsupported timeframe: {timeframe}")
+        bars = self.load(symbol)
+        first = int(bars[0, 0]) if len(bars) else None
+        key = (normalize_symbol(symbol), timeframe)
+        cached = self._resampled.get(key)
+
+        # Rows only shift when history is prepended (by any process), which
+        # changes the first timestamp.
+        if cached is not None and cached[0] <= len(bars) and cached[1] == first:
+            # Only the bar that was still open can change: re-aggregate from
+            # its first 1m row onwards and keep the closed bars as they are.
+            _, _, last_start, out = cached
+            tail = resample(bars[last_start:], timeframe)
+            out = np.concatenate((out[:-1], tail))
+        else:
+            out = resample(bars, timeframe)
+
+        if len(out):
+            step = TIMEFRAMES[timeframe]
+            last_start = int(
+                np.searchsorted(bars[:, 0], out[-1, 0] // step * step, side="left")
+            )
+        else:
+            last_start = 0
+        self._resampled[key] = (len(bars), first, last_start, out)
+        return out[-limit:] if limit else out
+
+    def fetch_ohlcv(self, symbol, fetch, timeframe="1h", limit=100):
+        """
+        ccxt-style OHLCV list for a symbol, syncing the 1m history first.
+        """
+        # One extra bucket so the oldest returned bar is never a partial one.
+        minutes = (limit + 1) * TIMEFRAMES[timeframe] // TIMEFRAMES[BASE_TIMEFRAME]
+        self.sync(symbol, fetch, minutes)
+        return self.get(symbol, timeframe, limit).tolist()
+
+
+@lru_cache(maxsize=None)
+def get_candle_store():
+    """
+    Process-wide candle store, created on first use. CANDLE_DATA_DIR is read
+    here rather than at import so settings loaded from .env apply.
+    """
+    return CandleStore(os.getenv("CANDLE_DATA_DIR", DEFAULT_CANDLE_DATA_DIR))
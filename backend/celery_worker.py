@@ -1,26 +1,46 @@
 import os
 import time
-import pandas as pd
 
-from binance import Client
 from celery import Celery
 from celery.schedules import crontab
-from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from kombu import Exchange, Queue
 
-from trade_execution import execute_trade
+from candles import binance_fetcher, get_candle_store
+from locks import claim_execution, release_execution, symbol_lease
+from models import Trade
+from orderbook import get_orderbook_store
+from resources import REDIS_URL, get_binance_client, get_session
+from screener import SCREENER_TOP_N, binance_source, default_filters, get_snapshot
+from sharding import DEFAULT_QUEUE, PRIORITY_QUEUE, route_task, shard_queues
+from trade_execution import check_stop_loss_take_profit, execute_trade
 
 # Create Celery app
 celery_app = Celery(
     "trading_bot",
-    broker="redis://redis:6379/0",  # Redis URL as the message broker
-    backend="redis://redis:6379/0",  # Redis for result storage
+    broker=REDIS_URL,  # Redis URL as the message broker
+    backend=REDIS_URL,  # Redis for result storage
 )
 
 celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
+    # Symbol tasks are sharded onto trading.shard-N queues by consistent
+    # hashing; a worker started without -Q consumes every queue.
+    task_queues=[
+        Queue(name, Exchange(name), routing_key=name)
+        for name in [PRIORITY_QUEUE, DEFAULT_QUEUE] + shard_queues()
+    ],
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes=(route_task,),
+    # Queues are polled in the order given to the worker (priority first) and
+    # each worker reserves one task at a time, so SL/TP monitoring is picked
+    # up before scans that are already waiting.
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": list(range(10)),
+    },
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
 )
 
 celery_app.conf.beat_schedule = {
@@ -28,34 +48,30 @@ celery_app.conf.beat_schedule = {
         "task": "celery_worker.execute_periodic_trading",
         "schedule": crontab(minute="*/3"),  # Every minute
     },
+    "monitor-open-trades-every-minute": {
+        "task": "celery_worker.monitor_open_trades",
+        "schedule": crontab(),
+    },
 }
 
-load_dotenv()
-
-binance = Client(
-    api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_API_SECRET")
-)
-
 # Load strategy parameters from .env
 SHORT_TERM_MA = int(os.getenv("SHORT_TERM_MA", 10))  # Default to 10 if not set
 LONG_TERM_MA = int(os.getenv("LONG_TERM_MA", 50))  # Default to 50 if not set
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 
 @celery_app.task()
-def fetch_market_data(symbol: str):
+def fetch_market_data(symbol: str, interval: str = "1h"):
     """
     Fetch live market data (OHLCV) for a given symbol.
+    Bars are aggregated locally from the 1m history, so any interval
+    costs at most one incremental klines request per symbol.
     """
-    ohlcv = binance.get_klines(symbol=symbol, interval="1h", limit=50)
+    import pandas as pd
 
-    # Slice the first 6 columns (timestamp, open, high, low, close, volume)
-    ohlcv = [row[:6] for row in ohlcv]
+    binance = get_binance_client()
+    ohlcv = get_candle_store().fetch_ohlcv(
+        symbol, binance_fetcher(binance, symbol), interval, limit=50
+    )
 
     # Create DataFrame with the appropriate column names
     df = pd.DataFrame(
@@ -72,7 +88,20 @@ def fetch_market_data(symbol: str):
 def execute_trading_strategy(symbol: str):
     """
     Execute a trading strategy and return JSON-serializable results.
+    Runs under a per-symbol lease so two workers never trade the same symbol
+    at once, and each signal is executed at most once per bar.
     """
+    with symbol_lease(symbol) as acquired:
+        if not acquired:
+            return {"message": f"{symbol} is being processed by another worker."}
+        return run_trading_strategy(symbol)
+
+
+def run_trading_strategy(symbol: str):
+    import pandas as pd
+
+    binance = get_binance_client()
+
     # Fetch live market data
     ohlcv = fetch_market_data(symbol)
     df = pd.DataFrame(ohlcv)
@@ -81,14 +110,44 @@ def execute_trading_strategy(symbol: str):
     df["short_ma"] = df["close"].rolling(window=SHORT_TERM_MA).mean()
     df["long_ma"] = df["close"].rolling(window=LONG_TERM_MA).mean()
 
-    with SessionLocal() as session:
-        if (
-            df["short_ma"].iloc[-1] > df["long_ma"].iloc[-1]
-            and df["short_ma"].iloc[-2] <= df["long_ma"].iloc[-2]
-        ):
-            ticker = {"last": float(df["close"].iloc[-1])}  # Simulated ticker
+    if (
+        df["short_ma"].iloc[-1] > df["long_ma"].iloc[-1]
+        and df["short_ma"].iloc[-2] <= df["long_ma"].iloc[-2]
+    ):
+        action = "BUY"
+    elif (
+        df["short_ma"].iloc[-1] < df["long_ma"].iloc[-1]
+        and df["short_ma"].iloc[-2] >= df["long_ma"].iloc[-2]
+    ):
+        action = "SELL"
+    else:
+        return {"message": "No trade signal detected."}
+
+    bar = pd.Timestamp(df["timestamp"].iloc[-1]).isoformat()
+    claim = f"{symbol}:{action}:{bar}"
+    if not claim_execution(claim):
+        return {"message": f"{action} signal for {symbol} at {bar} already executed."}
+
+    ticker = {"last": float(df["close"].iloc[-1])}  # Simulated ticker
+    try:
+        return _record_trade(action, symbol, ticker, binance)
+    except Exception:
+        # The trade was not written; let a retry or the next run execute it.
+        release_execution(claim)
+        raise
+
+
+def _record_trade(action, symbol, ticker, binance):
+    with get_session() as session:
+        if action == "BUY":
             trade = execute_trade(
-                "BUY", symbol, ticker, session=session, binance=binance, quantity=1
+                "BUY",
+                symbol,
+                ticker,
+                session=session,
+                binance=binance,
+                quantity=1,
+                book=get_orderbook_store(),
             )
 
             # Convert Trade object to dictionary
@@ -101,33 +160,62 @@ def execute_trading_strategy(symbol: str):
                 "stop_loss_price": trade.stop_loss_price,
                 "take_profit_price": trade.take_profit_price,
             }
-        elif (
-            df["short_ma"].iloc[-1] < df["long_ma"].iloc[-1]
-            and df["short_ma"].iloc[-2] >= df["long_ma"].iloc[-2]
-        ):
-            ticker = {"last": float(df["close"].iloc[-1])}  # Simulated ticker
-            trade = execute_trade(
-                "SELL", symbol, ticker, session=session, binance=binance
-            )
 
-            # Convert Trade object to dictionary
-            return {
-                "symbol": trade.symbol,
-                "action": trade.action,
-                "exit_price": trade.exit_price,
-                "profit_loss": trade.profit_loss,
-                "timestamp": trade.timestamp.isoformat(),  # Convert datetime to string
-            }
-        else:
-            return {"message": "No trade signal detected."}
+        trade = execute_trade(
+            "SELL",
+            symbol,
+            ticker,
+            session=session,
+            binance=binance,
+            book=get_orderbook_store(),
+        )
+
+        # Convert Trade object to dictionary
+        return {
+            "symbol": trade.symbol,
+            "action": trade.action,
+            "exit_price": trade.exit_price,
+            "profit_loss": trade.profit_loss,
+            "timestamp": trade.timestamp.isoformat(),  # Convert datetime to string
+        }
+
+
+@celery_app.task
+def monitor_open_trades():
+    """
+    Close open trades that hit Stop-Loss or Take-Profit. Routed to the
+    priority queue so it runs ahead of routine strategy scans.
+    """
+    binance = get_binance_client()
+    closed = []
+    with get_session() as session:
+        active_trades = session.query(Trade).filter(Trade.exit_price == None).all()
+        for trade in active_trades:
+            with symbol_lease(trade.symbol) as acquired:
+                if not acquired:
+                    continue  # A strategy task owns the symbol; check next run
+                # The trade may have been closed since the query above.
+                session.refresh(trade)
+                if trade.exit_price is not None:
+                    continue
+                ticker = binance.get_symbol_ticker(symbol=trade.symbol.replace("/", ""))
+                result = check_stop_loss_take_profit(
+                    trade, float(ticker["price"]), session, book=get_orderbook_store()
+                )
+                if result:
+                    closed.append(
+                        {"id": trade.id, "symbol": trade.symbol, "reason": result}
+                    )
+    return closed
 
 
 @celery_app.task
 def execute_periodic_trading():
     """
-    Periodically execute trading strategies for predefined symbols.
+    Periodically execute trading strategies for the top screened symbols.
     """
-    symbols = ["BTCUSDT", "ETHUSDT"]  # Add your trading pairs here
+    snapshot = get_snapshot("binance").refresh(binance_source(get_binance_client()))
+    symbols = snapshot.top(SCREENER_TOP_N, default_filters())
     for symbol in symbols:
         execute_trading_strategy.delay(symbol)
         time.sleep(2)
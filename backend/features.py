@@ -0,0 +1,135 @@
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+FEATURE_NAMES = ["return_1", "return_5", "volatility", "ma_ratio", "rsi", "volume_z"]
+
+SHORT_MA = 5
+LONG_MA = 20
+VOLATILITY_WINDOW = 20
+RSI_WINDOW = 14
+VOLUME_WINDOW = 20
+# Bars of history needed before the first row where every feature is defined.
+LOOKBACK = max(LONG_MA, VOLATILITY_WINDOW + 1, RSI_WINDOW + 1, VOLUME_WINDOW)
+
+
+def _rolling(x, window, reduce):
+    """
+    Apply `reduce` over trailing windows of the last axis, NaN-padded on the left.
+    """
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        out[..., window - 1 :] = reduce(sliding_window_view(x, window, axis=-1), -1)
+    return out
+
+
+def compute_features(bars):
+    """
+    Per-bar features for OHLCV arrays shaped (..., T, 6), e.g. (symbols, T, 6).
+    Returns (..., T, len(FEATURE_NAMES)); the first LOOKBACK - 1 rows are NaN.
+    """
+    bars = np.asarray(bars, dtype=np.float64)
+    close = bars[..., 4]
+    volume = bars[..., 5]
+
+    log_close = np.log(close)
+    returns = np.zeros_like(close)
+    returns[..., 1:] = np.diff(log_close, axis=-1)
+
+    return_5 = np.full(close.shape, np.nan)
+    return_5[..., 5:] = log_close[..., 5:] - log_close[..., :-5]
+
+    volatility = _rolling(returns, VOLATILITY_WINDOW, np.std)
+    ma_ratio = _rolling(close, SHORT_MA, np.mean) / _rolling(close, LONG_MA, np.mean)
+
+    gains = _rolling(np.clip(returns, 0, None), RSI_WINDOW, np.mean)
+    losses = _rolling(np.clip(-returns, 0, None), RSI_WINDOW, np.mean)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = np.where(gains + losses > 0, 100 * gains / (gains + losses), 50.0)
+        volume_std = _rolling(volume, VOLUME_WINDOW, np.std)
+        volume_z = np.where(
+            volume_std > 0,
+            (volume - _rolling(volume, VOLUME_WINDOW, np.mean)) / volume_std,
+            0.0,
+        )
+
+    features = np.stack(
+        [returns, return_5, volatility, ma_ratio - 1, rsi, volume_z], axis=-1
+    )
+    features[..., : LOOKBACK - 1, :] = np.nan
+    return features
+
+
+def feature_windows(features, window):
+    """
+    All trailing windows of a (T, F) feature matrix as an (N, window, F) array,
+    skipping windows that reach into the undefined warm-up rows.
+    """
+    windows = sliding_window_view(features, window, axis=0).transpose(0, 2, 1)
+    return windows[LOOKBACK - 1 :]
+
+
+class FeatureCache:
+    """
+    Per-symbol feature matrices that are extended only with the bars that
+    changed since the previous call (new bars plus the still-open last bar).
+    """
+
+    def __init__(self, window=32):
+        self.window = window
+        # symbol -> (bar timestamps, features)
+        self._features = {}
+
+    def update(self, symbol, bars):
+        """
+        Return the (T, F) feature matrix for `bars`, recomputing only the tail.
+        """
+        bars = np.asarray(bars, dtype=np.float64)
+        timestamps = bars[:, 0]
+        cached = self._features.get(symbol)
+
+        if cached is not None and len(timestamps):
+            old_timestamps, old_features = cached
+            # Where the new bars begin in the cache, and where the last cached
+            # bar (which may have been open) sits in the new bars.
+            offset = int(np.searchsorted(old_timestamps, timestamps[0]))
+            start = int(np.searchsorted(timestamps, old_timestamps[-1]))
+            if (
+                offset < len(old_timestamps)
+                and old_timestamps[offset] == timestamps[0]
+                and start < len(timestamps)
+                and timestamps[start] == old_timestamps[-1]
+                and start == len(old_timestamps) - 1 - offset
+            ):
+                head = max(start - LOOKBACK, 0)
+                tail = compute_features(bars[head:])[start - head :]
+                features = np.concatenate((old_features[offset : offset + start], tail))
+                self._features[symbol] = (timestamps.copy(), features)
+                return features
+
+        features = compute_features(bars)
+        self._features[symbol] = (timestamps.copy(), features)
+        return features
+
+    def tensor(self, bars_by_symbol, window=None):
+        """
+        Stack the latest `window` feature rows of every symbol into an
+        (n_symbols, window, F) tensor, in the order of `bars_by_symbol`.
+        Symbols with too little history are NaN-padded at the front.
+        """
+        window = window or self.window
+        tensor = np.full((len(bars_by_symbol), window, len(FEATURE_NAMES)), np.nan)
+        for i, (symbol, bars) in enumerate(bars_by_symbol.items()):
+            if len(bars):
+                latest = self.update(symbol, bars)[-window:]
+                tensor[i, window - len(latest) :] = latest
+        return tensor
+
+
+@lru_cache(maxsize=None)
+def get_feature_cache():
+    """
+    Process-wide feature cache, created on first use.
+    """
+    return FeatureCache()
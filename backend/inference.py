@@ -0,0 +1,115 @@
+import os
+import pickle
+from functools import lru_cache
+
+import numpy as np
+
+from features import FEATURE_NAMES
+
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "models", "signal.pkl"
+)
+DEFAULT_BUY_THRESHOLD = 0.55
+DEFAULT_SELL_THRESHOLD = 0.45
+
+
+def model_path():
+    """
+    MODEL_PATH, read on use so values loaded from .env apply.
+    """
+    return os.getenv("MODEL_PATH", DEFAULT_MODEL_PATH)
+
+
+class SignalModel:
+    """
+    Batched wrapper around a CPU classifier that scores feature windows.
+    Works with any estimator exposing `predict_proba` (scikit-learn,
+    LightGBM) or with an ONNX Runtime session.
+    """
+
+    def __init__(
+        self,
+        estimator=None,
+        session=None,
+        window=None,
+        buy_threshold=DEFAULT_BUY_THRESHOLD,
+        sell_threshold=DEFAULT_SELL_THRESHOLD,
+    ):
+        self.estimator = estimator
+        self.session = session
+        self.window = window
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+
+    def predict_proba(self, tensor):
+        """
+        Probability that the next bars go up, for an (N, window, F) tensor.
+        Rows with missing features are returned as NaN.
+        """
+        tensor = np.asarray(tensor, dtype=np.float32)
+        flat = tensor.reshape(len(tensor), -1)
+        valid = np.isfinite(flat).all(axis=1)
+        proba = np.full(len(flat), np.nan)
+        if not valid.any():
+            return proba
+
+        if self.session is not None:
+            input_name = self.session.get_inputs()[0].name
+            outputs = self.session.run(None, {input_name: flat[valid]})
+            scores = outputs[-1]
+            # skl2onnx emits class probabilities as a list of {label: proba}.
+            if isinstance(scores, list):
+                scores = np.array([row[1] for row in scores])
+            else:
+                scores = np.asarray(scores)[:, 1]
+        else:
+            scores = self.estimator.predict_proba(flat[valid])[:, 1]
+        proba[valid] = scores
+        return proba
+
+    def predict(self, tensor):
+        """
+        "BUY" / "SELL" / "hold" per row of an (N, window, F) tensor.
+        """
+        proba = self.predict_proba(tensor)
+        actions = np.full(len(proba), "hold", dtype=object)
+        actions[proba >= self.buy_threshold] = "BUY"
+        actions[proba <= self.sell_threshold] = "SELL"
+        return actions.tolist()
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "wb") as f:
+            pickle.dump({"estimator": self.estimator, "window": self.window}, f)
+
+
+def load_model(path=None):
+    """
+    Load a pickled SignalModel payload, or an ONNX model when the path ends
+    in `.onnx` (requires onnxruntime). The window length of ONNX models is
+    read from the input shape. `path` defaults to MODEL_PATH.
+    """
+    path = path or model_path()
+    if path.endswith(".onnx"):
+        import onnxruntime
+
+        session = onnxruntime.InferenceSession(path, providers=["CPUExecutionProvider"])
+        width = session.get_inputs()[0].shape[1]
+        window = width // len(FEATURE_NAMES) if isinstance(width, int) else None
+        return SignalModel(session=session, window=window)
+
+    with open(path, "rb") as f:
+        payload = pickle.load(f)
+    return SignalModel(estimator=payload["estimator"], window=payload["window"])
+
+
+@lru_cache(maxsize=None)
+def get_model():
+    """
+    Model configured by MODEL_PATH, loaded once per process, with the
+    AI_BUY_THRESHOLD / AI_SELL_THRESHOLD decision thresholds.
+    """
+    model = load_model(model_path())
+    model.buy_threshold = float(os.getenv("AI_BUY_THRESHOLD", DEFAULT_BUY_THRESHOLD))
+    model.sell_threshold = float(os.getenv("AI_SELL_THRESHOLD", DEFAULT_SELL_THRESHOLD))
+    return model
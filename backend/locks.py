@@ -0,0 +1,85 @@
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+from resources import get_redis
+from symbols import normalize_symbol
+
+LEASE_TTL = float(os.getenv("SYMBOL_LEASE_TTL", 60))  # seconds
+EXECUTION_TTL = float(os.getenv("EXECUTION_KEY_TTL", 24 * 60 * 60))  # seconds
+
+# Delete the key only if we still own it, so an expired lease that was
+# picked up by another worker is never released by the previous holder.
+RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+# Push the expiry out only while we still own the lease.
+RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _keep_alive(client, key, token, ttl_ms, stop):
+    # Renew well before expiry; stop quietly once the lease is lost.
+    while not stop.wait(ttl_ms / 3000):
+        try:
+            if not client.eval(RENEW_SCRIPT, 1, key, token, ttl_ms):
+                return
+        except Exception as e:
+            print(f"Error renewing {key}: {e}")
+
+
+@contextmanager
+def symbol_lease(symbol, ttl=LEASE_TTL, client=None):
+    """
+    Hold an exclusive, expiring lease on a symbol. Yields True if acquired;
+    callers that get False must skip the symbol instead of waiting.
+
+    The lease is renewed in the background while the block runs, so a slow
+    task keeps it; if the worker dies it still expires after `ttl`. Symbols
+    are normalized, so "BTC/USDT" and "BTCUSDT" share one lease.
+    """
+    client = client or get_redis()
+    key = f"lease:symbol:{normalize_symbol(symbol)}"
+    token = uuid.uuid4().hex
+    ttl_ms = int(ttl * 1000)
+    acquired = bool(client.set(key, token, nx=True, px=ttl_ms))
+    if not acquired:
+        yield False
+        return
+
+    stop = threading.Event()
+    renewer = threading.Thread(
+        target=_keep_alive, args=(client, key, token, ttl_ms, stop), daemon=True
+    )
+    renewer.start()
+    try:
+        yield True
+    finally:
+        stop.set()
+        renewer.join()
+        client.eval(RELEASE_SCRIPT, 1, key, token)
+
+
+def claim_execution(key, ttl=EXECUTION_TTL, client=None):
+    """
+    Record that the action identified by `key` ran. Returns False if it was
+    already claimed, which makes redelivered or duplicated tasks no-ops.
+    """
+    client = client or get_redis()
+    return bool(client.set(f"executed:{key}", 1, nx=True, px=int(ttl * 1000)))
+
+
+def release_execution(key, client=None):
+    """
+    Drop a claim whose action failed, so a retry or the next run can execute it.
+    """
+    client = client or get_redis()
+    client.delete(f"executed:{key}")
@@ -1,70 +1,75 @@
 import os, sys
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
-import ccxt
-import pandas as pd
-from dotenv import load_dotenv
-from fastapi import FastAPI
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from typing import List, Literal
+from fastapi import APIRouter, FastAPI, HTTPException
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from candles import TIMEFRAMES, Timeframe, ccxt_fetcher, get_candle_store
 from models import Base, Trade, BacktestResult
-from strategies import moving_average_crossover
+from orderbook import get_orderbook_store
+from resources import close_resources, get_engine, get_exchange, get_session
+from strategies import ai_signals, moving_average_crossover
 from schemas import TradeResponse
+from screener import SCREENER_TOP_N, ccxt_source, default_filters, get_snapshot
 from trade_execution import check_stop_loss_take_profit, buy_process, sell_process
 
 
-load_dotenv()
+router = APIRouter()
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ensure all tables are created (initialization will use Alembic migrations)
+    Base.metadata.create_all(bind=get_engine())
+    yield
+    close_resources()
 
-# Database connection
-API_KEY = os.getenv("BINANCE_API_KEY")
-API_SECRET = os.getenv("BINANCE_API_SECRET")
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# Ensure all tables are created (initialization will use Alembic migrations)
-Base.metadata.create_all(bind=engine)
-
-# Binance connection
-binance = ccxt.binance({"apiKey": API_KEY, "secret": API_SECRET})
+def create_app():
+    """
+    Build the API application. Database engine and exchange clients are
+    created lazily by `resources` and reused across requests.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router)
+    return app
 
 
-@app.get("/status")
+@router.get("/status")
 async def status():
     return {"message": "Trading bot is running!"}
 
 
-@app.get("/simulate")
-async def simulate_trading():
+@router.get("/simulate")
+async def simulate_trading(strategy: Literal["ma", "ai"] = "ma"):
     """
-    Simulate trading for the top 10 profitable trading pairs based on moving average crossover.
+    Simulate trading for the top-ranked pairs from the screener based on moving average crossover.
     Includes Stop-Loss, Take-Profit, and position sizing.
+    With `strategy=ai` the pairs are scored in one batch by the trained model;
+    until a model has been trained this returns 409.
     """
-    tickers = binance.fetch_tickers()
-    sorted_tickers = sorted(
-        [
-            {"symbol": symbol, "change": ticker["percentage"]}
-            for symbol, ticker in tickers.items()
-            if "USDT" in symbol and ticker["percentage"] is not None
-        ],
-        key=lambda x: x["change"],
-        reverse=True,
-    )
-    top_pairs = sorted_tickers[:10]
+    binance = get_exchange()
+    snapshot = get_snapshot("ccxt").refresh(ccxt_source(binance))
+    top_pairs = snapshot.top(SCREENER_TOP_N, default_filters())
     simulated_trades = []
 
-    with SessionLocal() as session:
-        for pair in top_pairs:
-            symbol = pair["symbol"]
-            action = moving_average_crossover(symbol, binance, 5, 10)
+    if strategy == "ai":
+        try:
+            signals = ai_signals(top_pairs, binance)
+        except FileNotFoundError as e:
+            raise HTTPException(
+                status_code=409,
+                detail=f"No trained model ({e.filename}); run train_model.py first.",
+            )
+
+    with get_session() as session:
+        for symbol in top_pairs:
+            if strategy == "ai":
+                action = signals[symbol]
+            else:
+                action = moving_average_crossover(symbol, binance, 5, 10)
 
             if action == "hold":
                 continue
@@ -73,7 +78,9 @@ async def simulate_trading():
 
             if action == "BUY":
                 try:
-                    trade = buy_process(symbol, ticker, session, binance)
+                    trade = buy_process(
+                        symbol, ticker, session, binance, book=get_orderbook_store()
+                    )
                     simulated_trades.append(
                         {
                             "symbol": trade.symbol,
@@ -90,7 +97,9 @@ async def simulate_trading():
 
             elif action == "SELL":
                 try:
-                    trade = sell_process(symbol, ticker, session)
+                    trade = sell_process(
+                        symbol, ticker, session, book=get_orderbook_store()
+                    )
                     simulated_trades.append(
                         {
                             "symbol": trade.symbol,
@@ -108,9 +117,9 @@ async def simulate_trading():
     return {"message": "Simulation complete.", "simulated_trades": simulated_trades}
 
 
-@app.get("/trades", response_model=List[TradeResponse])
+@router.get("/trades", response_model=List[TradeResponse])
 async def get_trades():
-    with SessionLocal() as session:
+    with get_session() as session:
         trades = session.query(Trade).all()
 
     # Deduplicate trades based on symbol and timestamp
@@ -122,9 +131,9 @@ async def get_trades():
     return response
 
 
-@app.get("/performance")
+@router.get("/performance")
 async def get_performance():
-    with SessionLocal() as session:
+    with get_session() as session:
         # Fetch all trades sorted by timestamp
         trades = session.query(Trade).order_by(Trade.timestamp).all()
 
@@ -149,7 +158,7 @@ async def get_performance():
     return performance_data
 
 
-@app.get("/backtest")
+@router.get("/backtest")
 async def backtest_trading(
     symbol: str = "BTC/USDT",
     short_term: int = 10,
@@ -157,12 +166,21 @@ async def backtest_trading(
     initial_balance: float = 10000.0,
     stop_loss_percent: float = 0.05,
     take_profit_percent: float = 0.1,
+    timeframe: Timeframe = "1h",
 ):
     """
     Backtest a trading strategy using historical data.
+    Fills add the slippage of the recorded order book (if any) at each bar's
+    close for a position of the full balance.
     """
+    import pandas as pd
+
+    binance = get_exchange()
+
     # Fetch historical OHLCV data
-    ohlcv = binance.fetch_ohlcv(symbol, timeframe="1h", limit=long_term * 5)
+    ohlcv = get_candle_store().fetch_ohlcv(
+        symbol, ccxt_fetcher(binance, symbol), timeframe, limit=long_term * 5
+    )
     df = pd.DataFrame(
         ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
     )
@@ -171,6 +189,10 @@ async def backtest_trading(
     df["short_ma"] = df["close"].rolling(window=short_term).mean()
     df["long_ma"] = df["close"].rolling(window=long_term).mean()
 
+    book = get_orderbook_store()
+    # Bars are stamped with their open; the close is priced against the book then.
+    close_time = df["timestamp"] + TIMEFRAMES[timeframe]
+
     # Initialize variables for simulation
     balance = initial_balance
     position = None
@@ -185,7 +207,10 @@ async def backtest_trading(
         ):
             if not position:
                 # Buy signal
-                entry_price = df["close"][i]
+                quantity = balance / df["close"][i]
+                entry_price = book.fill_price(
+                    symbol, "buy", quantity, df["close"][i], close_time[i]
+                )
                 position = "long"
                 continue
 
@@ -195,7 +220,9 @@ async def backtest_trading(
         ):
             if position == "long":
                 # Sell signal
-                exit_price = df["close"][i]
+                exit_price = book.fill_price(
+                    symbol, "sell", quantity, df["close"][i], close_time[i]
+                )
                 profit_loss = (exit_price - entry_price) / entry_price * 100
                 balance += balance * (profit_loss / 100)
                 trades.append(
@@ -215,6 +242,7 @@ async def backtest_trading(
 
     return {
         "symbol": symbol,
+        "timeframe": timeframe,
         "short_term": short_term,
         "long_term": long_term,
         "initial_balance": initial_balance,
@@ -227,9 +255,9 @@ async def backtest_trading(
     }
 
 
-@app.get("/backtest-results")
+@router.get("/backtest-results")
 async def get_backtest_results():
-    session = SessionLocal()
+    session = get_session()
     results = session.query(BacktestResult).all()
     session.close()
     return [
@@ -248,21 +276,27 @@ async def get_backtest_results():
     ]
 
 
-@app.post("/monitor")
+@router.post("/monitor")
 async def monitor_active_trades():
     """
     Monitor active trades and close if Stop-Loss or Take-Profit is hit.
     """
-    session = SessionLocal()
+    binance = get_exchange()
+    session = get_session()
     active_trades = session.query(Trade).filter(Trade.exit_price == None).all()
     for trade in active_trades:
         ticker = binance.fetch_ticker(trade.symbol)
         current_price = ticker["last"]
 
-        result = check_stop_loss_take_profit(trade, current_price, session)
+        result = check_stop_loss_take_profit(
+            trade, current_price, session, book=get_orderbook_store()
+        )
         if result:
             print(
                 f"Trade {trade.id} closed due to {result} at price {trade.exit_price}."
             )
     session.close()
     return {"message": "Monitoring complete."}
+
+
+app = create_app()
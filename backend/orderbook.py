@@ -0,0 +1,393 @@
+"""
+L2 order-book snapshot store with fast VWAP-for-quantity queries.
+
+Snapshots keep the top BOOK_DEPTH levels per side in a fixed-width numpy
+structured record. Prices are stored as integer ticks: the best bid is
+absolute, every other level is the tick distance from the previous one
+(asks start from the best bid), so most offsets are small int32 values.
+Records are appended to one file per symbol and read back memory-mapped.
+
+Fills are priced as slippage: the walk's VWAP relative to the snapshot mid,
+applied to the caller's ticker or candle price. Only snapshots at most
+BOOK_MAX_AGE seconds older than the query are used; otherwise the caller's
+price is returned unchanged.
+
+    python orderbook.py record --symbols BTC/USDT ETH/USDT --count 600
+    python orderbook.py replay feed.jsonl --tick-size 0.01
+"""
+
+import argparse
+import json
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from symbols import normalize_symbol
+
+DEFAULT_BOOK_DEPTH = 20
+DEFAULT_BOOK_MAX_AGE = 60.0  # seconds
+DEFAULT_ORDERBOOK_DATA_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "orderbooks"
+)
+
+
+def snapshot_dtype(depth):
+    return np.dtype(
+        [
+            ("timestamp", "<i8"),
+            ("best_bid", "<i8"),  # ticks
+            ("bid_delta", "<i4", (depth,)),  # ticks below the previous bid level
+            ("ask_delta", "<i4", (depth,)),  # ticks above the previous level
+            ("bid_qty", "<f4", (depth,)),
+            ("ask_qty", "<f4", (depth,)),
+        ]
+    )
+
+
+def _float_gcd(a, b, tolerance):
+    while b > tolerance:
+        remainder = a % b
+        if b - remainder <= tolerance:
+            remainder = 0.0
+        a, b = b, remainder
+    return a
+
+
+def infer_tick_size(books):
+    """
+    Largest step that divides every gap between price levels across the
+    books, used when no tick size is given. Gaps of 0.25 and 0.5 give 0.25.
+    """
+    prices = np.unique(
+        [
+            level[0]
+            for book in books
+            for side in ("bids", "asks")
+            for level in book[side]
+        ]
+    )
+    if len(prices) == 0:
+        return None
+    if len(prices) == 1:
+        return float(prices[0]) * 1e-8
+    # Float noise in the gaps (0.010000000000218) is far below this, and so
+    # is rounding the result to the tolerance's decimal place.
+    tolerance = float(prices[-1]) * 1e-10
+    tick = 0.0
+    for gap in np.diff(prices):
+        tick = _float_gcd(float(gap), tick, tolerance) if tick else float(gap)
+    return round(tick, -int(np.floor(np.log10(tolerance))))
+
+
+def _to_ticks(prices, tick_size):
+    ticks = np.rint(prices / tick_size)
+    off_grid = np.abs(ticks * tick_size - prices) > tick_size * 1e-3
+    if off_grid.any():
+        raise ValueError(
+            f"Price {prices[off_grid][0]} is not a multiple of the tick size "
+            f"{tick_size}; pass the market's tick size when recording"
+        )
+    return ticks.astype(np.int64)
+
+
+def encode(books, depth, tick_size):
+    """
+    Encode ccxt-style books ({"timestamp", "bids", "asks"}) as records.
+    Missing levels repeat the last price with zero quantity; books with no
+    levels at all are skipped. Raises ValueError if a price is not on the
+    tick grid, rather than silently rounding levels together.
+    """
+    books = [book for book in books if book["bids"] or book["asks"]]
+    records = np.zeros(len(books), dtype=snapshot_dtype(depth))
+    for i, book in enumerate(books):
+        bids = np.array(book["bids"][:depth], dtype=np.float64).reshape(-1, 2)
+        asks = np.array(book["asks"][:depth], dtype=np.float64).reshape(-1, 2)
+        bid_ticks = _to_ticks(bids[:, 0], tick_size)
+        ask_ticks = _to_ticks(asks[:, 0], tick_size)
+        best_bid = bid_ticks[0] if len(bid_ticks) else ask_ticks[0]
+
+        records["timestamp"][i] = book.get("timestamp") or int(time.time() * 1000)
+        records["best_bid"][i] = best_bid
+        records["bid_delta"][i, : len(bids)] = -np.diff(bid_ticks, prepend=best_bid)
+        records["ask_delta"][i, : len(asks)] = np.diff(ask_ticks, prepend=best_bid)
+        records["bid_qty"][i, : len(bids)] = bids[:, 1]
+        records["ask_qty"][i, : len(asks)] = asks[:, 1]
+    return records
+
+
+def decode(records, tick_size):
+    """
+    Absolute level prices plus cumulative quantity/notional per side, each
+    shaped (n_snapshots, depth), ready for VWAP lookups.
+    """
+    best_bid = records["best_bid"][:, None]
+    sides = {}
+    for side, sign in (("bid", -1), ("ask", 1)):
+        ticks = best_bid + sign * np.cumsum(records[f"{side}_delta"], axis=1)
+        price = ticks * tick_size
+        qty = records[f"{side}_qty"].astype(np.float64)
+        sides[side] = (price, np.cumsum(qty, axis=1), np.cumsum(price * qty, axis=1))
+    return sides
+
+
+class OrderBookStore:
+    """
+    Append-only, memory-mapped snapshot files per symbol. Decoded levels are
+    cached and extended only with snapshots recorded since the last query.
+    """
+
+    def __init__(
+        self,
+        data_dir=DEFAULT_ORDERBOOK_DATA_DIR,
+        depth=DEFAULT_BOOK_DEPTH,
+        max_age=DEFAULT_BOOK_MAX_AGE,
+    ):
+        self.data_dir = data_dir
+        self.depth = depth
+        self.max_age = max_age
+        os.makedirs(self.data_dir, exist_ok=True)
+        # symbol -> (timestamps, {"bid"/"ask": (price, cum_qty, cum_notional)})
+        self._decoded = {}
+        self._meta = {}
+
+    def _path(self, symbol):
+        return os.path.join(self.data_dir, f"{normalize_symbol(symbol)}.book")
+
+    def meta(self, symbol):
+        symbol = normalize_symbol(symbol)
+        if symbol not in self._meta:
+            path = self._path(symbol) + ".json"
+            if not os.path.exists(path):
+                return None
+            with open(path) as f:
+                self._meta[symbol] = json.load(f)
+        return self._meta[symbol]
+
+    def has(self, symbol):
+        return self.meta(symbol) is not None and len(self.load(symbol)) > 0
+
+    def load(self, symbol):
+        """
+        Raw snapshot records of a symbol as a read-only memmap.
+        """
+        meta = self.meta(symbol)
+        path = self._path(symbol)
+        if meta is None or not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=snapshot_dtype(self.depth))
+        return np.memmap(path, dtype=snapshot_dtype(meta["depth"]), mode="r")
+
+    def record(self, symbol, books, tick_size=None):
+        """
+        Append ccxt-style books for a symbol. The tick size is fixed by the
+        first call (given, or inferred from all books of that call) and
+        reused for later snapshots; books priced off that grid raise
+        ValueError and nothing is written.
+        """
+        meta = self.meta(symbol)
+        if meta is None:
+            tick_size = tick_size or infer_tick_size(books)
+            if tick_size is None:
+                return 0  # no price levels to record yet
+            records = encode(books, self.depth, tick_size)
+            meta = {"depth": self.depth, "tick_size": tick_size}
+            with open(self._path(symbol) + ".json", "w") as f:
+                json.dump(meta, f)
+            self._meta[normalize_symbol(symbol)] = meta
+        else:
+            records = encode(books, meta["depth"], meta["tick_size"])
+
+        with open(self._path(symbol), "ab") as f:
+            f.write(records.tobytes())
+        return len(records)
+
+    def levels(self, symbol):
+        """
+        Timestamps and decoded sides for every stored snapshot of a symbol.
+        """
+        symbol = normalize_symbol(symbol)
+        records = self.load(symbol)
+        cached = self._decoded.get(symbol)
+        if cached is not None and len(cached[0]) == len(records):
+            return cached
+
+        if cached is None or len(cached[0]) > len(records):
+            cached = None
+            start = 0
+        else:
+            start = len(cached[0])
+        decoded = decode(records[start:], self.meta(symbol)["tick_size"])
+        if cached is not None:
+            for side, arrays in decoded.items():
+                decoded[side] = tuple(
+                    np.concatenate((old, new))
+                    for old, new in zip(cached[1][side], arrays)
+                )
+        self._decoded[symbol] = (records["timestamp"].astype(np.int64), decoded)
+        return self._decoded[symbol]
+
+    def _walk(self, symbol, side, quantities, timestamps):
+        """
+        VWAP and mid of the snapshot used by each query, NaN where no
+        snapshot is at most `max_age` older than the query time.
+        """
+        times, sides = self.levels(symbol)
+        price, cum_qty, cum_notional = sides["ask" if side == "buy" else "bid"]
+        quantities = np.atleast_1d(np.asarray(quantities, dtype=np.float64))
+        if timestamps is None:
+            timestamps = np.full(len(quantities), int(time.time() * 1000))
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.int64))
+        rows = np.searchsorted(times, timestamps, side="right") - 1
+        fresh = (rows >= 0) & (timestamps - times[rows] <= self.max_age * 1000)
+        rows = np.maximum(rows, 0)
+
+        depth = cum_qty.shape[1]
+        full = (cum_qty[rows] < quantities[:, None]).sum(axis=1)
+        level = np.minimum(full, depth - 1)
+        previous = np.maximum(level - 1, 0)
+        filled_qty = np.where(level > 0, cum_qty[rows, previous], 0.0)
+        filled_notional = np.where(level > 0, cum_notional[rows, previous], 0.0)
+        notional = filled_notional + (quantities - filled_qty) * price[rows, level]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(quantities > 0, notional / quantities, price[rows, 0])
+
+        bids, asks = sides["bid"], sides["ask"]
+        # One-sided snapshots have no meaningful mid.
+        two_sided = (bids[1][rows, -1] > 0) & (asks[1][rows, -1] > 0)
+        mid = np.where(two_sided, (bids[0][rows, 0] + asks[0][rows, 0]) / 2, np.nan)
+        return np.where(fresh, vwap, np.nan), np.where(fresh, mid, np.nan)
+
+    def vwap_many(self, symbol, side, quantities, timestamps=None):
+        """
+        Average fill price of market orders, vectorized over many queries.
+
+        `side` is "buy" (walks the asks) or "sell" (walks the bids). Each
+        query uses the latest snapshot at or before its timestamp (now when
+        omitted) and is NaN if that snapshot is older than `max_age`.
+        Quantity beyond the recorded depth is priced at the deepest level.
+        """
+        return self._walk(symbol, side, quantities, timestamps)[0]
+
+    def slippage_many(self, symbol, side, quantities, timestamps=None):
+        """
+        Fill price relative to the snapshot mid (0.001 = 10 bps worse than
+        mid for a buy), NaN where no fresh two-sided snapshot exists.
+        """
+        vwap, mid = self._walk(symbol, side, quantities, timestamps)
+        return vwap / mid - 1
+
+    def vwap(self, symbol, side, quantity, timestamp=None):
+        return float(
+            self.vwap_many(
+                symbol, side, [quantity], None if timestamp is None else [timestamp]
+            )[0]
+        )
+
+    def fill_price(self, symbol, side, quantity, price, timestamp=None):
+        """
+        `price` (a ticker or candle price) moved by the slippage the recorded
+        book shows for the quantity. Without a fresh snapshot `price` is
+        returned as is.
+        """
+        if not self.has(symbol):
+            return float(price)
+        slippage = self.slippage_many(
+            symbol, side, [quantity], None if timestamp is None else [timestamp]
+        )[0]
+        if not np.isfinite(slippage):
+            return float(price)
+        return float(price) * (1 + float(slippage))
+
+
+def replay(path, store, tick_size=None):
+    """
+    Load a local JSONL feed ({"symbol", "timestamp", "bids", "asks"} per line,
+    optionally "tick_size"). `tick_size` overrides the feed; without either
+    it is inferred from the symbol's books.
+    """
+    books = {}
+    ticks = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                book = json.loads(line)
+                books.setdefault(book["symbol"], []).append(book)
+                if book.get("tick_size"):
+                    ticks.setdefault(book["symbol"], book["tick_size"])
+    return {
+        symbol: store.record(symbol, rows, tick_size or ticks.get(symbol))
+        for symbol, rows in books.items()
+    }
+
+
+def market_tick_size(exchange, symbol):
+    """
+    Price tick of a loaded ccxt market, or None if it is unknown.
+    """
+    import ccxt
+
+    market = (exchange.markets or {}).get(symbol)
+    precision = market["precision"].get("price") if market else None
+    if precision is None:
+        return None
+    if exchange.precisionMode == ccxt.TICK_SIZE:
+        return float(precision)
+    return 10.0**-precision
+
+
+def record_live(exchange, store, symbols, count, interval):
+    """
+    Poll `fetch_order_book` for each symbol `count` times.
+    """
+    for _ in range(count):
+        for symbol in symbols:
+            book = exchange.fetch_order_book(symbol, limit=store.depth)
+            try:
+                store.record(symbol, [book], market_tick_size(exchange, symbol))
+            except ValueError as e:
+                print(f"Skipping {symbol} snapshot: {e}")
+        time.sleep(interval)
+
+
+@lru_cache(maxsize=None)
+def get_orderbook_store():
+    """
+    Process-wide order-book store, created on first use. Settings are read
+    here rather than at import so values loaded from .env apply.
+    """
+    return OrderBookStore(
+        os.getenv("ORDERBOOK_DATA_DIR", DEFAULT_ORDERBOOK_DATA_DIR),
+        int(os.getenv("BOOK_DEPTH", DEFAULT_BOOK_DEPTH)),
+        float(os.getenv("BOOK_MAX_AGE", DEFAULT_BOOK_MAX_AGE)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay L2 order books.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    record = commands.add_parser("record", help="Poll the exchange")
+    record.add_argument("--symbols", nargs="+", default=["BTC/USDT", "ETH/USDT"])
+    record.add_argument("--count", type=int, default=60)
+    record.add_argument("--interval", type=float, default=1.0)
+    replay_parser = commands.add_parser("replay", help="Load a local JSONL feed")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument(
+        "--tick-size", type=float, help="Price tick (default: from the feed)"
+    )
+    args = parser.parse_args()
+
+    store = get_orderbook_store()
+    if args.command == "replay":
+        for symbol, count in replay(args.path, store, args.tick_size).items():
+            print(f"{symbol}: {count} snapshots")
+    else:
+        from resources import get_exchange
+
+        exchange = get_exchange()
+        exchange.load_markets()
+        record_live(exchange, store, args.symbols, args.count, args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://redis:6379/0")
+
+
+@lru_cache(maxsize=None)
+def get_engine():
+    """
+    Database engine, created on first use and shared by the process.
+    """
+    return create_engine(os.getenv("DATABASE_URL"))
+
+
+@lru_cache(maxsize=None)
+def get_sessionmaker():
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+def get_session():
+    """
+    Open a new session; use it as a context manager like `SessionLocal()`.
+    """
+    return get_sessionmaker()()
+
+
+@lru_cache(maxsize=None)
+def get_exchange():
+    """
+    ccxt Binance client. ccxt is only imported when the first request needs it.
+    """
+    import ccxt
+
+    return ccxt.binance(
+        {
+            "apiKey": os.getenv("BINANCE_API_KEY"),
+            "secret": os.getenv("BINANCE_API_SECRET"),
+        }
+    )
+
+
+@lru_cache(maxsize=None)
+def get_binance_client():
+    """
+    python-binance Client. Its constructor pings the API, so it is deferred
+    until a task actually talks to the exchange.
+    """
+    from binance import Client
+
+    return Client(
+        api_key=os.getenv("BINANCE_API_KEY"), api_secret=os.getenv("BINANCE_API_SECRET")
+    )
+
+
+@lru_cache(maxsize=None)
+def get_redis():
+    """
+    Redis client for leases and idempotency keys (same server as the broker).
+    """
+    import redis
+
+    return redis.Redis.from_url(REDIS_URL)
+
+
+def close_resources():
+    """
+    Dispose of the engine (if one was created) and forget cached clients.
+    """
+    if get_engine.cache_info().currsize:
+        get_engine().dispose()
+    for factory in (
+        get_engine,
+        get_sessionmaker,
+        get_exchange,
+        get_binance_client,
+        get_redis,
+    ):
+        factory.cache_clear()
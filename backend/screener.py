@@ -0,0 +1,269 @@
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+SCREENER_QUOTE = os.getenv("SCREENER_QUOTE", "USDT")
+SCREENER_TOP_N = int(os.getenv("SCREENER_TOP_N", 10))
+SCREENER_TTL = float(os.getenv("SCREENER_TTL", 30))  # seconds between full pulls
+# Minimum 24h quote volume, as a quantile of the pairs sharing the same quote.
+SCREENER_MIN_VOLUME_QUANTILE = float(os.getenv("SCREENER_MIN_VOLUME_QUANTILE", 0.5))
+
+NUMERIC_FIELDS = ["change", "volume", "spread", "volatility", "last"]
+# Positive weights favour high values, negative weights favour low values.
+DEFAULT_WEIGHTS = {"change": 1.0, "volume": 0.25, "spread": -0.25}
+
+# Quote assets used to split concatenated Binance symbols such as "BTCUSDT".
+KNOWN_QUOTES = sorted(
+    ["USDT", "USDC", "FDUSD", "TUSD", "BUSD", "BTC", "ETH", "BNB", "EUR", "TRY", "BRL"],
+    key=len,
+    reverse=True,
+)
+
+
+def _columns(symbols, quotes, change, volume, bid, ask, high, low, last):
+    """
+    Build a columnar batch; missing values (None) become NaN.
+    """
+
+    def as_float(values):
+        return np.array(values, dtype=np.float64)
+
+    bid, ask, high, low, last = map(as_float, (bid, ask, high, low, last))
+    mid = (bid + ask) / 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = np.where(mid > 0, (ask - bid) / mid, np.nan)
+        volatility = np.where(last > 0, (high - low) / last, np.nan)
+    return {
+        "symbol": np.array(symbols, dtype=object),
+        "quote": np.array(quotes, dtype=object),
+        "change": as_float(change),
+        "volume": as_float(volume),
+        "spread": spread,
+        "volatility": volatility,
+        "last": last,
+    }
+
+
+def split_ccxt_symbol(symbol):
+    """
+    Quote asset of a ccxt symbol: "BTC/USDT" -> "USDT", "BTC/USDT:USDT" -> "USDT".
+    """
+    if "/" not in symbol:
+        return None
+    return symbol.split("/")[1].split(":")[0]
+
+
+def normalize_ccxt(tickers):
+    """
+    Columnar batch from ccxt `fetch_tickers()` ({"BTC/USDT": {...}, ...}).
+    """
+    rows = list(tickers.values())
+    return _columns(
+        [t["symbol"] for t in rows],
+        [split_ccxt_symbol(t["symbol"]) for t in rows],
+        [t.get("percentage") for t in rows],
+        [t.get("quoteVolume") for t in rows],
+        [t.get("bid") for t in rows],
+        [t.get("ask") for t in rows],
+        [t.get("high") for t in rows],
+        [t.get("low") for t in rows],
+        [t.get("last") for t in rows],
+    )
+
+
+def split_binance_symbol(symbol):
+    """
+    Quote asset of a Binance symbol: "BTCUSDT" -> "USDT", "USDTBRL" -> "BRL".
+    """
+    for quote in KNOWN_QUOTES:
+        if symbol.endswith(quote) and len(symbol) > len(quote):
+            return quote
+    return None
+
+
+def normalize_binance(tickers):
+    """
+    Columnar batch from python-binance `get_ticker()` rows or from the
+    24hr ticker stream payload (short keys: s, P, q, b, a, h, l, c).
+    """
+
+    def field(long, short):
+        return [t.get(long, t.get(short)) for t in tickers]
+
+    symbols = field("symbol", "s")
+    return _columns(
+        symbols,
+        [split_binance_symbol(symbol) for symbol in symbols],
+        field("priceChangePercent", "P"),
+        field("quoteVolume", "q"),
+        field("bidPrice", "b"),
+        field("askPrice", "a"),
+        field("highPrice", "h"),
+        field("lowPrice", "l"),
+        field("lastPrice", "c"),
+    )
+
+
+class Filter:
+    """
+    Composable row filter: `quote("USDT") & liquid(0.5) & ~max_spread(0.01)`.
+    """
+
+    def __init__(self, mask_fn):
+        self.mask_fn = mask_fn
+
+    def __call__(self, snapshot):
+        return self.mask_fn(snapshot)
+
+    def __and__(self, other):
+        return Filter(lambda s: self(s) & other(s))
+
+    def __or__(self, other):
+        return Filter(lambda s: self(s) | other(s))
+
+    def __invert__(self):
+        return Filter(lambda s: ~self(s))
+
+
+def quote(asset):
+    return Filter(lambda s: s.columns["quote"] == asset)
+
+
+def min_volume(volume):
+    return Filter(lambda s: s.columns["volume"] >= volume)
+
+
+def liquid(quantile=SCREENER_MIN_VOLUME_QUANTILE):
+    """
+    Keep symbols whose quote volume is at least the given quantile of the
+    pairs in the same quote asset (BTC volumes are not compared with USDT).
+    """
+    return Filter(lambda s: s.columns["volume"] >= s.volume_threshold(quantile))
+
+
+def max_spread(spread):
+    return Filter(lambda s: s.columns["spread"] <= spread)
+
+
+def has(field):
+    return Filter(lambda s: np.isfinite(s.columns[field]))
+
+
+class TickerSnapshot:
+    """
+    Columnar snapshot of the whole ticker universe. A full pull replaces the
+    universe (dropping delisted pairs); partial batches (e.g. from the ticker
+    stream) are merged in place by symbol between full pulls.
+    """
+
+    def __init__(self, ttl=SCREENER_TTL):
+        self.ttl = ttl
+        self.refreshed_at = 0.0
+        self.columns = _columns([], [], [], [], [], [], [], [], [])
+        self._index = {}
+        # quantile -> per-row volume threshold within the row's quote asset,
+        # computed on first use after each update
+        self._volume_thresholds = {}
+
+    def __len__(self):
+        return len(self.columns["symbol"])
+
+    def update(self, batch, full=False):
+        """
+        Merge a columnar batch (see `normalize_ccxt` / `normalize_binance`).
+        With `full=True` the batch is the whole universe and symbols missing
+        from it are removed.
+        """
+        symbols = batch["symbol"]
+        if full:
+            self.columns = {name: np.array(batch[name]) for name in self.columns}
+            self._index = {symbol: i for i, symbol in enumerate(symbols)}
+        else:
+            rows = np.array([self._index.get(s, -1) for s in symbols], dtype=np.int64)
+            new = np.flatnonzero(rows < 0)
+            if len(new):
+                rows[new] = len(self) + np.arange(len(new))
+                for i, symbol in zip(rows[new], symbols[new]):
+                    self._index[symbol] = int(i)
+                for name, column in self.columns.items():
+                    self.columns[name] = np.concatenate((column, batch[name][new]))
+
+            for name in ["quote"] + NUMERIC_FIELDS:
+                self.columns[name][rows] = batch[name]
+
+        self._volume_thresholds = {}
+
+    def refresh(self, source, force=False):
+        """
+        Pull a full batch from `source` unless the snapshot is still fresh.
+        """
+        if force or time.monotonic() - self.refreshed_at >= self.ttl:
+            self.update(source(), full=True)
+            self.refreshed_at = time.monotonic()
+        return self
+
+    def _quote_quantile(self, quantile):
+        """
+        Per-row volume quantile of the row's quote asset (inf when unknown).
+        """
+        volume = self.columns["volume"]
+        quotes = self.columns["quote"].astype(str)
+        threshold = np.full(len(volume), np.inf)
+        for asset in np.unique(quotes):
+            rows = quotes == asset
+            finite = volume[rows & np.isfinite(volume)]
+            if len(finite):
+                threshold[rows] = np.quantile(finite, quantile)
+        return threshold
+
+    def volume_threshold(self, quantile):
+        if quantile not in self._volume_thresholds:
+            self._volume_thresholds[quantile] = self._quote_quantile(quantile)
+        return self._volume_thresholds[quantile]
+
+    def rank(self, filters=None, weights=None):
+        """
+        Symbols passing `filters`, ordered by a weighted sum of per-factor
+        percentile ranks (best first).
+        """
+        weights = weights or DEFAULT_WEIGHTS
+        mask = np.ones(len(self), dtype=bool)
+        for field in weights:
+            mask &= np.isfinite(self.columns[field])
+        if filters is not None:
+            mask &= filters(self)
+
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+        score = np.zeros(len(rows))
+        for field, weight in weights.items():
+            ranks = np.argsort(np.argsort(self.columns[field][rows], kind="stable"))
+            score += weight * ranks / max(len(rows) - 1, 1)
+        order = rows[np.argsort(-score, kind="stable")]
+        return self.columns["symbol"][order].tolist()
+
+    def top(self, n=SCREENER_TOP_N, filters=None, weights=None):
+        return self.rank(filters, weights)[:n]
+
+
+def default_filters(quote_asset=SCREENER_QUOTE):
+    return quote(quote_asset) & liquid()
+
+
+def ccxt_source(exchange):
+    return lambda: normalize_ccxt(exchange.fetch_tickers())
+
+
+def binance_source(client):
+    return lambda: normalize_binance(client.get_ticker())
+
+
+@lru_cache(maxsize=None)
+def get_snapshot(name):
+    """
+    Process-wide snapshot per ticker source ("ccxt" or "binance").
+    """
+    return TickerSnapshot()
@@ -0,0 +1,72 @@
+import bisect
+import hashlib
+import os
+from functools import lru_cache
+
+from symbols import normalize_symbol
+
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", 4))
+VIRTUAL_NODES = 160  # points per shard on the ring, evens out the key spread
+
+PRIORITY_QUEUE = "trading.priority"
+DEFAULT_QUEUE = "trading.default"
+MONITOR_PRIORITY = 0  # Redis transport: 0 is the highest priority
+# Tasks whose first argument is a symbol and that should stay on its shard.
+SHARDED_TASKS = {"celery_worker.execute_trading_strategy"}
+PRIORITY_TASKS = {"celery_worker.monitor_open_trades"}
+
+
+def shard_queue(index):
+    return f"trading.shard-{index}"
+
+
+def shard_queues(count=SHARD_COUNT):
+    return [shard_queue(i) for i in range(count)]
+
+
+def _hash(key):
+    # md5 instead of hash(): the ring must agree across processes and hosts.
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring: adding or removing a node only moves the keys
+    that hashed next to it, so each worker keeps a stable set of symbols.
+    """
+
+    def __init__(self, nodes, virtual_nodes=VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in nodes for i in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._nodes = [node for _, node in points]
+
+    def node_for(self, key):
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._nodes[index]
+
+
+@lru_cache(maxsize=None)
+def get_ring():
+    return HashRing(shard_queues())
+
+
+def queue_for(symbol):
+    """
+    Name of the queue that owns a symbol ("BTC/USDT" and "BTCUSDT" agree).
+    """
+    return get_ring().node_for(normalize_symbol(symbol))
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """
+    Celery router: symbol tasks go to their shard, SL/TP monitoring goes to
+    the priority queue, everything else to the default queue.
+    """
+    if name in PRIORITY_TASKS:
+        return {"queue": PRIORITY_QUEUE, "priority": MONITOR_PRIORITY}
+    if name in SHARDED_TASKS:
+        symbol = args[0] if args else kwargs["symbol"]
+        return {"queue": queue_for(symbol)}
+    return {"queue": DEFAULT_QUEUE}
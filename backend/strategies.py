@@ -1,9 +1,12 @@
 import random
-import pandas as pd
+
+from candles import ccxt_fetcher, get_candle_store
+from features import LOOKBACK, get_feature_cache
+from inference import get_model
 
 
 def moving_average_crossover(
-    symbol, binance, short_term=5, long_term=10, simulate=True
+    symbol, binance, short_term=5, long_term=10, simulate=True, timeframe="1h"
 ):
     """
     Moving Average Crossover Strategy for simulation and live testing.
@@ -12,9 +15,13 @@ def moving_average_crossover(
         # Generate random signals for testing
         return random.choice(["BUY", "SELL", "hold"])
 
+    import pandas as pd
+
     # Fetch historical OHLCV data (live mode)
     try:
-        ohlcv = binance.fetch_ohlcv(symbol, timeframe="1h", limit=long_term * 2)
+        ohlcv = get_candle_store().fetch_ohlcv(
+            symbol, ccxt_fetcher(binance, symbol), timeframe, limit=long_term * 2
+        )
         df = pd.DataFrame(
             ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
         )
@@ -40,3 +47,32 @@ def moving_average_crossover(
 
     # Default to HOLD if no signal
     return "hold"
+
+
+def ai_signals(symbols, binance, timeframe="1h"):
+    """
+    Score every symbol with the configured model in one batched prediction.
+    Features come from the feature cache, so only new bars are recomputed.
+    """
+    model = get_model()
+    cache = get_feature_cache()
+    window = model.window or cache.window
+    store = get_candle_store()
+
+    bars_by_symbol = {}
+    for symbol in symbols:
+        try:
+            bars_by_symbol[symbol] = store.fetch_ohlcv(
+                symbol,
+                ccxt_fetcher(binance, symbol),
+                timeframe,
+                limit=window + LOOKBACK,
+            )
+        except Exception as e:
+            print(f"Error fetching data for {symbol}: {e}")
+
+    signals = {symbol: "hold" for symbol in symbols}
+    if bars_by_symbol:
+        actions = model.predict(cache.tensor(bars_by_symbol, window))
+        signals.update(zip(bars_by_symbol, actions))
+    return signals
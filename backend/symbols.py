@@ -0,0 +1,7 @@
+def normalize_symbol(symbol):
+    """
+    Exchange-agnostic symbol key: ccxt "BTC/USDT" and Binance "BTCUSDT"
+    both become "BTCUSDT", so files, caches and leases line up across the
+    API (ccxt) and the worker (python-binance).
+    """
+    return symbol.replace("/", "").replace(":", "").upper()
@@ -0,0 +1,134 @@
+import multiprocessing
+import time
+
+import numpy as np
+import pytest
+
+from candles import TIMEFRAMES, CandleStore, resample
+
+MINUTE = TIMEFRAMES["1m"]
+
+
+def make_bars(start, n, rng):
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    bars = np.empty((n, 6))
+    bars[:, 0] = start + np.arange(n) * MINUTE
+    bars[:, 1] = close + rng.normal(0, 0.1, n)
+    bars[:, 2] = np.maximum(bars[:, 1], close) + 1
+    bars[:, 3] = np.minimum(bars[:, 1], close) - 1
+    bars[:, 4] = close
+    bars[:, 5] = rng.uniform(1, 10, n)
+    return bars
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CandleStore(str(tmp_path))
+
+
+@pytest.mark.parametrize("timeframe", ["5m", "1h", "4h"])
+def test_incremental_get_matches_full_resample(store, timeframe):
+    rng = np.random.default_rng(0)
+    start = 1_700_000_000_000 // TIMEFRAMES["1d"] * TIMEFRAMES["1d"] + 7 * MINUTE
+    bars = make_bars(start, 2_000, rng)
+    store.ingest("BTC/USDT", bars[:300].tolist())
+    expected = bars[:300]
+    position = 300
+
+    for _ in range(60):
+        # The exchange keeps rewriting the open minute before new ones arrive.
+        rewrite = expected[-1].copy()
+        rewrite[2] += rng.uniform(0, 1)
+        rewrite[4] = rng.uniform(rewrite[3], rewrite[2])
+        rewrite[5] += rng.uniform(0, 1)
+        count = int(rng.integers(0, 40))
+        new = bars[position : position + count]
+        store.ingest("BTC/USDT", [rewrite.tolist()] + new.tolist())
+        expected = np.concatenate((expected[:-1], rewrite[None], new))
+        position += count
+
+        np.testing.assert_array_equal(store.load("BTC/USDT"), expected)
+        np.testing.assert_allclose(
+            store.get("BTC/USDT", timeframe), resample(expected, timeframe)
+        )
+
+
+def test_sync_backfills_older_history(store):
+    rng = np.random.default_rng(1)
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    history = make_bars(now - 2_999 * MINUTE, 3_000, rng)
+
+    def fetch(since, limit):
+        rows = history[history[:, 0] >= since][:limit]
+        return rows.tolist()
+
+    store.fetch_ohlcv("BTC/USDT", fetch, "1m", limit=50)
+    assert len(store.get("BTC/USDT", "1m")) >= 50
+
+    bars = store.fetch_ohlcv("BTCUSDT", fetch, "1m", limit=2_500)
+    assert len(bars) == 2_500
+    stored = store.load("BTC/USDT")
+    np.testing.assert_array_equal(stored, history[-len(stored) :])
+
+    assert len(store.fetch_ohlcv("BTC/USDT", fetch, "4h", limit=10)) == 10
+
+
+def history_fetcher(history):
+    def fetch(since, limit):
+        return history[history[:, 0] >= since][:limit].tolist()
+
+    return fetch
+
+
+def recent_history(n, seed):
+    now = int(time.time() * 1000) // MINUTE * MINUTE
+    return make_bars(now - (n - 1) * MINUTE, n, np.random.default_rng(seed))
+
+
+def test_backfill_under_other_spelling_invalidates_cache(store):
+    fetch = history_fetcher(recent_history(3_000, seed=2))
+    store.fetch_ohlcv("BTC/USDT", fetch, "1h", limit=5)
+    store.fetch_ohlcv("BTCUSDT", fetch, "1h", limit=40)
+
+    np.testing.assert_allclose(
+        store.get("BTC/USDT", "1h"), resample(store.load("BTC/USDT"), "1h")
+    )
+
+
+def test_backfill_from_other_store_invalidates_cache(tmp_path):
+    fetch = history_fetcher(recent_history(3_000, seed=3))
+    api, worker = CandleStore(str(tmp_path)), CandleStore(str(tmp_path))
+    api.fetch_ohlcv("BTC/USDT", fetch, "1h", limit=5)
+    worker.fetch_ohlcv("BTCUSDT", fetch, "1h", limit=40)
+
+    np.testing.assert_allclose(
+        api.get("BTC/USDT", "1h"), resample(api.load("BTC/USDT"), "1h")
+    )
+
+
+def _ingest_pages(data_dir, pages):
+    store = CandleStore(data_dir)
+    for page in pages:
+        store.ingest("BTCUSDT", page)
+
+
+def test_concurrent_ingest_keeps_rows_unique_and_ordered(tmp_path):
+    bars = make_bars(1_700_000_000_000, 2_000, np.random.default_rng(4))
+    # Overlapping pages, some older than what the other process wrote first.
+    pages = [bars[i : i + 300].tolist() for i in range(1_000, 1_700, 100)]
+    pages += [bars[i : i + 300].tolist() for i in range(700, 0, -100)]
+    ctx = multiprocessing.get_context("fork")
+    workers = [
+        ctx.Process(target=_ingest_pages, args=(str(tmp_path), pages[k::2]))
+        for k in range(2)
+    ] + [ctx.Process(target=_ingest_pages, args=(str(tmp_path), pages[::-1]))]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    stored = CandleStore(str(tmp_path)).load("BTCUSDT")
+    assert (np.diff(stored[:, 0]) > 0).all()
+    rows = np.searchsorted(bars[:, 0], stored[:, 0])
+    np.testing.assert_array_equal(stored, bars[rows])
@@ -0,0 +1,134 @@
+import json
+
+import numpy as np
+import pytest
+
+from orderbook import OrderBookStore, decode, encode, infer_tick_size, replay
+
+T0 = 1_700_000_000_000
+
+
+def book(timestamp, best_bid, tick=0.01, depth=5, symbol="BTC/USDT"):
+    return {
+        "symbol": symbol,
+        "timestamp": timestamp,
+        "bids": [[round(best_bid - i * tick, 8), 1.0 + i] for i in range(depth)],
+        "asks": [[round(best_bid + (i + 1) * tick, 8), 2.0 + i] for i in range(depth)],
+    }
+
+
+def write_feed(path, books):
+    with open(path, "w") as f:
+        for row in books:
+            f.write(json.dumps(row) + "\n")
+    return str(path)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OrderBookStore(str(tmp_path / "books"), depth=5, max_age=60)
+
+
+def test_encode_decode_round_trip():
+    books = [book(T0, 30000.0), book(T0 + 1000, 30000.05, depth=3)]
+    sides = decode(encode(books, 5, 0.01), 0.01)
+
+    for i, row in enumerate(books):
+        for side, key in (("bid", "bids"), ("ask", "asks")):
+            price, cum_qty, _ = sides[side]
+            levels = np.array(row[key])
+            n = len(levels)
+            np.testing.assert_allclose(price[i, :n], levels[:, 0])
+            np.testing.assert_allclose(cum_qty[i, :n], np.cumsum(levels[:, 1]))
+            # Missing levels repeat the last price with no quantity.
+            np.testing.assert_allclose(price[i, n:], levels[-1, 0])
+            np.testing.assert_allclose(cum_qty[i, n:], cum_qty[i, n - 1])
+
+
+def test_encode_skips_empty_books():
+    books = [{"timestamp": T0, "bids": [], "asks": []}, book(T0 + 1000, 100.0)]
+    assert len(encode(books, 5, 0.01)) == 1
+
+
+def test_infer_tick_size_uses_gcd_of_gaps():
+    quarter = {"bids": [[100.0, 1], [99.5, 1]], "asks": [[100.25, 1], [101.0, 1]]}
+    assert infer_tick_size([quarter]) == 0.25
+    assert infer_tick_size([book(T0, 30000.01), book(T0, 30000.37)]) == 0.01
+
+
+def test_replay_uses_feed_tick_size(store, tmp_path):
+    rows = [dict(book(T0, 100.0, tick=0.5), tick_size=0.25)]
+    replay(write_feed(tmp_path / "feed.jsonl", rows), store)
+    assert store.meta("BTCUSDT")["tick_size"] == 0.25
+
+
+def test_vwap_many_matches_hand_computed_walk(store, tmp_path):
+    replay(write_feed(tmp_path / "feed.jsonl", [book(T0, 100.0)]), store)
+    # Asks: 100.01 x 2, 100.02 x 3, 100.03 x 4, 100.04 x 5, 100.05 x 6
+    expected = [
+        100.01,
+        (2 * 100.01 + 2 * 100.02) / 4,
+        (2 * 100.01 + 3 * 100.02 + 4 * 100.03 + 1 * 100.04) / 10,
+        # Beyond the recorded depth the deepest level is used.
+        (2 * 100.01 + 3 * 100.02 + 4 * 100.03 + 5 * 100.04 + 16 * 100.05) / 30,
+    ]
+    quantities = [1, 4, 10, 30]
+    vwap = store.vwap_many("BTC/USDT", "buy", quantities, [T0 + 500] * 4)
+    np.testing.assert_allclose(vwap, expected)
+
+    # Bids: 100.00 x 1, 99.99 x 2
+    sell = store.vwap_many("BTCUSDT", "sell", [3], [T0])
+    np.testing.assert_allclose(sell, [(100.00 + 2 * 99.99) / 3])
+
+
+def test_levels_cache_extends_with_new_snapshots(store, tmp_path):
+    replay(write_feed(tmp_path / "a.jsonl", [book(T0, 100.0)]), store)
+    times, _ = store.levels("BTC/USDT")
+    assert len(times) == 1
+
+    later = [book(T0 + 1000, 101.0), book(T0 + 2000, 102.0)]
+    replay(write_feed(tmp_path / "b.jsonl", later), store)
+    times, sides = store.levels("BTC/USDT")
+    full = decode(np.array(store.load("BTC/USDT")), 0.01)
+    np.testing.assert_array_equal(times, [T0, T0 + 1000, T0 + 2000])
+    for side in ("bid", "ask"):
+        for cached, expected in zip(sides[side], full[side]):
+            np.testing.assert_allclose(cached, expected)
+    np.testing.assert_allclose(
+        store.vwap_many("BTC/USDT", "buy", [1, 1], [T0 + 1500, T0 + 2500]),
+        [101.01, 102.01],
+    )
+
+
+def test_fill_price_applies_slippage_and_ignores_stale_books(store, tmp_path):
+    replay(write_feed(tmp_path / "feed.jsonl", [book(T0, 30000.0)]), store)
+    mid = (30000.00 + 30000.01) / 2
+    slippage = ((2 * 30000.01 + 2 * 30000.02) / 4) / mid - 1
+
+    fill = store.fill_price("BTC/USDT", "buy", 4, 60000, T0 + 1000)
+    assert fill == pytest.approx(60000 * (1 + slippage))
+    # Too old for the query time, before the first snapshot, or no time at all.
+    assert store.fill_price("BTC/USDT", "buy", 4, 60000, T0 + 61_000) == 60000
+    assert store.fill_price("BTC/USDT", "buy", 4, 60000, T0 - 1000) == 60000
+    assert store.fill_price("BTC/USDT", "buy", 4, 60000) == 60000
+
+
+def test_record_rejects_prices_off_the_inferred_tick(store):
+    store.record("BTC/USDT", [book(T0, 100.0, tick=0.1, depth=3)])
+    assert store.meta("BTC/USDT")["tick_size"] == 0.1
+
+    finer = {
+        "timestamp": T0 + 1000,
+        "bids": [[100.05, 1.0], [100.04, 1.0]],
+        "asks": [[100.07, 1.0], [100.08, 1.0]],
+    }
+    with pytest.raises(ValueError, match="tick size"):
+        store.record("BTC/USDT", [finer])
+    assert len(store.load("BTC/USDT")) == 1
+
+
+def test_replay_with_tick_size_keeps_finer_levels(store, tmp_path):
+    rows = [book(T0, 100.0, tick=0.1, depth=3), book(T0 + 1000, 100.05)]
+    replay(write_feed(tmp_path / "feed.jsonl", rows), store, tick_size=0.01)
+    _, sides = store.levels("BTC/USDT")
+    np.testing.assert_allclose(sides["bid"][0][1, :2], [100.05, 100.04])
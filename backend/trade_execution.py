@@ -19,9 +19,11 @@ def calculate_position_size(balance, entry_price, stop_loss_percent):
     return round(position_size, 6)  # Round to 6 decimals for precision
 
 
-def buy_process(symbol, ticker, session, binance, quantity=None):
+def buy_process(symbol, ticker, session, binance, quantity=None, book=None):
     """
     Handles the process of buying a trade.
+    With an order-book store, the ticker's last price is adjusted by the
+    slippage of walking the asks for the position size.
     """
     existing_trade = (
         session.query(Trade)
@@ -40,6 +42,14 @@ def buy_process(symbol, ticker, session, binance, quantity=None):
     if quantity:
         position_size = quantity  # Override with provided quantity
 
+    if book is not None:
+        entry_price = book.fill_price(symbol, "buy", position_size, entry_price)
+        if not quantity:
+            # Size against the price we would actually pay.
+            position_size = calculate_position_size(
+                balance, entry_price, STOP_LOSS_PERCENT
+            )
+
     trade = Trade(
         symbol=symbol,
         action="BUY",
@@ -54,9 +64,11 @@ def buy_process(symbol, ticker, session, binance, quantity=None):
     return trade
 
 
-def sell_process(symbol, ticker, session):
+def sell_process(symbol, ticker, session, book=None):
     """
     Handles the process of selling a trade.
+    With an order-book store, the exit price includes the slippage of walking
+    the bids.
     """
     trade = (
         session.query(Trade)
@@ -68,6 +80,8 @@ def sell_process(symbol, ticker, session):
         raise ValueError(f"No active BUY trade for {symbol} to SELL.")
 
     current_price = ticker["last"]
+    if book is not None:
+        current_price = book.fill_price(symbol, "sell", trade.quantity, current_price)
     trade.exit_price = current_price
     trade.profit_loss = (current_price - trade.entry_price) * trade.quantity
     trade.timestamp = datetime.now()
@@ -75,12 +89,24 @@ def sell_process(symbol, ticker, session):
     return trade
 
 
-def check_stop_loss_take_profit(trade, current_price, session):
+def check_stop_loss_take_profit(trade, current_price, session, book=None):
     """
     Check if trade hits stop-loss or take-profit.
+    A triggered stop-loss sells at market, so with an order-book store it
+    fills below the stop by the slippage of walking the bids.
+    Trades that are already closed are left untouched.
     """
+    if trade.exit_price is not None:
+        return None
     if current_price <= trade.stop_loss_price:
         trade.exit_price = trade.stop_loss_price
+        if book is not None:
+            trade.exit_price = min(
+                trade.stop_loss_price,
+                book.fill_price(
+                    trade.symbol, "sell", trade.quantity, trade.stop_loss_price
+                ),
+            )
         trade.profit_loss = (trade.exit_price - trade.entry_price) * trade.quantity
         trade.timestamp = datetime.now()
         session.commit()
@@ -96,13 +122,13 @@ def check_stop_loss_take_profit(trade, current_price, session):
     return None
 
 
-def execute_trade(action, symbol, ticker, session, binance, quantity=None):
+def execute_trade(action, symbol, ticker, session, binance, quantity=None, book=None):
     """
     Unified function to handle both BUY and SELL trades.
     """
     if action == "BUY":
-        return buy_process(symbol, ticker, session, binance)
+        return buy_process(symbol, ticker, session, binance, book=book)
     elif action == "SELL":
-        return sell_process(symbol, ticker, session)
+        return sell_process(symbol, ticker, session, book=book)
     else:
         raise ValueError(f"Invalid trade action: {action}")
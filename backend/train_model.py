@@ -0,0 +1,119 @@
+"""
+Train the signal model offline on historical candles.
+
+    python train_model.py --symbols BTC/USDT ETH/USDT --timeframe 1h --bars 3000
+
+Candles come from the local 1m candle store (synced from Binance unless
+--offline is given) and the model is written to MODEL_PATH.
+"""
+
+import argparse
+
+import numpy as np
+from dotenv import load_dotenv
+
+from candles import ccxt_fetcher, get_candle_store
+from features import LOOKBACK, compute_features, feature_windows
+from inference import SignalModel, model_path
+
+
+def build_dataset(bars_by_symbol, window, horizon):
+    """
+    Flattened feature windows, labels (close is higher `horizon` bars after
+    the window) and the timestamp each window ends at, across all symbols.
+    """
+    inputs, labels, timestamps = [], [], []
+    for bars in bars_by_symbol.values():
+        bars = np.asarray(bars, dtype=np.float64)
+        if len(bars) < LOOKBACK + window + horizon:
+            continue
+        windows = feature_windows(compute_features(bars), window)
+        end_rows = np.arange(len(windows)) + LOOKBACK + window - 2
+        keep = end_rows + horizon < len(bars)
+        end_rows = end_rows[keep]
+
+        close = bars[:, 4]
+        inputs.append(windows[keep].reshape(len(end_rows), -1))
+        labels.append(close[end_rows + horizon] > close[end_rows])
+        timestamps.append(bars[end_rows, 0])
+
+    if not inputs:
+        raise ValueError("Not enough candles to build a training set.")
+    inputs = np.concatenate(inputs).astype(np.float32)
+    labels = np.concatenate(labels).astype(np.int8)
+    timestamps = np.concatenate(timestamps)
+    order = np.argsort(timestamps, kind="stable")
+    return inputs[order], labels[order], timestamps[order]
+
+
+def make_estimator(kind):
+    if kind == "lightgbm":
+        import lightgbm
+
+        return lightgbm.LGBMClassifier(n_estimators=300, learning_rate=0.05)
+    if kind == "logistic":
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import make_pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        return make_pipeline(StandardScaler(), LogisticRegression(max_iter=1000))
+
+    from sklearn.ensemble import HistGradientBoostingClassifier
+
+    return HistGradientBoostingClassifier(max_iter=300, learning_rate=0.05)
+
+
+def load_candles(symbols, timeframe, bars, offline):
+    store = get_candle_store()
+    if offline:
+        return {symbol: store.get(symbol, timeframe, bars) for symbol in symbols}
+
+    from resources import get_exchange
+
+    exchange = get_exchange()
+    return {
+        symbol: store.fetch_ohlcv(
+            symbol, ccxt_fetcher(exchange, symbol), timeframe, limit=bars
+        )
+        for symbol in symbols
+    }
+
+
+def main():
+    # Same settings as the API and worker (MODEL_PATH, CANDLE_DATA_DIR, ...).
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Train the AI signal model.")
+    parser.add_argument("--symbols", nargs="+", default=["BTC/USDT", "ETH/USDT"])
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--bars", type=int, default=3000)
+    parser.add_argument("--window", type=int, default=32)
+    parser.add_argument("--horizon", type=int, default=1)
+    parser.add_argument(
+        "--model", choices=["gbm", "logistic", "lightgbm"], default="gbm"
+    )
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--offline", action="store_true")
+    parser.add_argument("--output", default=model_path())
+    args = parser.parse_args()
+
+    candles = load_candles(args.symbols, args.timeframe, args.bars, args.offline)
+    inputs, labels, _ = build_dataset(candles, args.window, args.horizon)
+
+    # Chronological split so the holdout never precedes the training data.
+    split = int(len(inputs) * (1 - args.test_size))
+    estimator = make_estimator(args.model)
+    estimator.fit(inputs[:split], labels[:split])
+
+    if split < len(inputs):
+        accuracy = (estimator.predict(inputs[split:]) == labels[split:]).mean()
+        print(
+            f"Holdout accuracy: {accuracy:.3f} "
+            f"(up-rate {labels[split:].mean():.3f}, {len(inputs) - split} samples)"
+        )
+
+    SignalModel(estimator=estimator, window=args.window).save(args.output)
+    print(f"Model saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()